@@ -6,6 +6,14 @@ class Settings(BaseSettings):
     BACKEND_URL: str = "http://localhost:8000"
     POSTGRES_URL: str
     DEBUG: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_BUDGETS: dict[str, int] = {
+        "blendshapes_ingest": 2,
+        "blendshapes_read": 4,
+        "findings_stream": 4,
+    }
     JWT_SECRET: str
     JWT_ALGO: str = "HS256"
     RESEND_API_KEY: str
@@ -14,9 +22,58 @@ class Settings(BaseSettings):
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "pitchpilot"
-    PRESENTATION_BATCH_SIZE: int = 2 
+    MINIO_UPLOAD_PART_SIZE: int = 16 * 1024 * 1024  # multipart part size, min. 5 MiB
     PRESENTATION_MAX_WORKERS: int = 4
+    FINDINGS_CACHE_HASH_DPI: int = 36
+    FINDINGS_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    FINDINGS_PARTIAL_AFTER_SECONDS: float = 0.0  # >0: store what is done by then, mark the rest pending
+    FINDINGS_MAX_PAGES_PER_CALL: int = 8
+    FINDINGS_BATCH_INPUT_TOKENS: int = 16000
+    FINDINGS_MAX_OUTPUT_TOKENS: int = 4096
+    FINDINGS_BATCH_OUTPUT_SHARE: float = 0.75  # expected output may fill this share of FINDINGS_MAX_OUTPUT_TOKENS
+    FINDINGS_TEXT_ROUTING: bool = True
+    FINDINGS_TEXT_MIN_CHARS: int = 40
+    FINDINGS_TEXT_MAX_IMAGE_COVERAGE: float = 0.1
+    FINDINGS_TEXT_MAX_DRAWINGS: int = 40
+    FINDINGS_VISUAL_MODE: str = "pdf"  # "pdf" sends the original pages, "image" downscaled JPEG renders
+    FINDINGS_RASTER_DPI: int = 110
+    FINDINGS_RASTER_JPEG_QUALITY: int = 75
+    FINDINGS_RASTER_DETAIL: str = "high"
+    FINDINGS_RASTER_PROCESSES: int = 2
     OPENAI_API_KEY: str
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_TIMEOUT_SECONDS: dict[str, float] = {
+        "findings": 120.0,
+        "audio_feedback": 90.0,
+    }
+    LLM_CONCURRENCY: dict[str, int] = {
+        "findings": 8,
+        "audio_feedback": 4,
+    }
+    LLM_DEADLINE_SECONDS: dict[str, float] = {  # whole call incl. queueing, retries and hedges
+        "findings": 300.0,
+        "audio_feedback": 240.0,
+    }
+    LLM_HEDGE_QUANTILE: dict[str, float] = {  # kinds listed here fire a duplicate after this latency quantile
+        "findings": 0.95,
+    }
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 5.0
+    LLM_RPM_LIMIT: int = 500  # per process
+    LLM_TPM_LIMIT: int = 200000  # per process
+    LLM_PRIORITY: dict[str, int] = {  # lower is served first
+        "audio_feedback": 0,
+        "findings": 1,
+    }
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MEMORY_ENTRIES: int = 512
+    LLM_CACHE_MAX_ROWS: int = 50000
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    LLM_CACHE_PRUNE_SECONDS: float = 600.0
+    LLM_STATS_LOG_SECONDS: float = 60.0  # 0 disables the worker's periodic stats line
     FINDING_WEIGHT_PREFLIGHT: float = 0.5
     FINDING_WEIGHT_ALTITUDE: float = 0.2
     FINDING_WEIGHT_FLIGHT_PATH: float = 0.2
@@ -33,6 +90,19 @@ class Settings(BaseSettings):
     SCORE_WEIGHT_FILLER: float = 0.2
     SCORE_WEIGHT_CLARITY: float = 5.0
     SCORE_WEIGHT_ENGAGEMENT: float = 0.1
+    BLENDSHAPE_CHUNK_SECONDS: float = 10.0
+    BLENDSHAPE_COPY_MAX_ROWS: int = 500
+    BLENDSHAPE_COPY_MAX_SECONDS: float = 1.0
+    BLENDSHAPE_WS_QUEUE_SIZE: int = 256
+    BLENDSHAPE_LIVE_WINDOW_SECONDS: float = 5.0
+    BLENDSHAPE_LIVE_PUSH_SECONDS: float = 1.0  # 0 disables live engagement feedback
+    EYE_TRACKING_GRID_SIZE: int = 40
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 900
+    JOB_HEARTBEAT_SECONDS: float = 60.0  # lease extension interval, well below JOB_LEASE_SECONDS
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: int = 10
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -4,15 +4,20 @@ app/core/database.py
 • Creates a single async engine from the POSTGRES_URL in Settings
 • Exposes `AsyncSession` factory (`async_session`)
 • Provides `get_session` FastAPI dependency
+• Per-endpoint pool budgets (`budgeted_session`, `get_budgeted_session`) so
+  one busy code path cannot take every pooled connection
+• Pool checkout counters (`pool_stats`) for visibility
 • Exposes a sync engine (`sync_engine`) for Alembic migrations
 """
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, AsyncIterator, Callable
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -25,6 +30,9 @@ async_engine = create_async_engine(
     settings.POSTGRES_URL,
     echo=False,              
     pool_pre_ping=True,     
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
 )
 
 sync_engine = create_engine(
@@ -60,8 +68,131 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# ───────────────────────────────────────────────
+# Pool budgets
+# ───────────────────────────────────────────────
+class PoolBudget:
+    """Caps how many pooled connections one endpoint may hold at once."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_use = 0
+        self.waiting = 0
+        self.peak = 0
+        self.acquired = 0
+        self.wait_seconds = 0.0
+
+    @contextlib.asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_seconds += time.perf_counter() - started
+        self.acquired += 1
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+        try:
+            yield
+        finally:
+            self.in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "peak": self.peak,
+            "acquired": self.acquired,
+            "avg_wait_ms": round(self.wait_seconds / self.acquired * 1000, 2) if self.acquired else 0.0,
+        }
+
+
+_budgets: dict[str, PoolBudget] = {}
+
+
+def pool_budget(name: str) -> PoolBudget:
+    """Budget for `name` from DB_POOL_BUDGETS; unknown names may use the whole pool."""
+    budget = _budgets.get(name)
+    if budget is None:
+        limit = settings.DB_POOL_BUDGETS.get(name, settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+        budget = _budgets[name] = PoolBudget(name, limit)
+    return budget
+
+
+@contextlib.asynccontextmanager
+async def budgeted_session(name: str) -> AsyncIterator[AsyncSession]:
+    """
+    Short-lived session counted against the `name` budget. Use this from
+    long-lived handlers (WebSockets, background writers) around each unit of
+    work instead of holding one session for the handler's lifetime.
+    """
+    async with pool_budget(name).hold():
+        async with async_session() as session:
+            yield session
+
+
+def get_budgeted_session(name: str) -> Callable[[], AsyncGenerator[AsyncSession, None]]:
+    """Like `get_session`, but the request waits for a slot in the `name` budget."""
+
+    async def dependency() -> AsyncGenerator[AsyncSession, None]:
+        async with budgeted_session(name) as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    return dependency
+
+
+# ───────────────────────────────────────────────
+# Pool visibility
+# ───────────────────────────────────────────────
+_pool_counters = {"checkouts": 0, "checkins": 0, "checked_out": 0, "peak_checked_out": 0}
+
+
+@event.listens_for(async_engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _pool_counters["checkouts"] += 1
+    _pool_counters["checked_out"] += 1
+    _pool_counters["peak_checked_out"] = max(_pool_counters["peak_checked_out"], _pool_counters["checked_out"])
+
+
+@event.listens_for(async_engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    _pool_counters["checkins"] += 1
+    _pool_counters["checked_out"] -= 1
+
+
+def pool_stats() -> dict:
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+        **_pool_counters,
+        "budgets": {name: budget.stats() for name, budget in _budgets.items()},
+    }
+
+
 @contextlib.asynccontextmanager
 async def lifespan(app):
     """Call in FastAPI(..., lifespan=lifespan) to cleanly dispose the engine."""
+    from app.services.blendshapes_writer import blendshape_writer
+    from app.services.findings.finding_events import finding_event_listener
+    from app.utils.openai.llm_gateway import llm_gateway
+
     yield
+    await blendshape_writer.close()
+    await finding_event_listener.close()
+    await llm_gateway.close()
     await async_engine.dispose()
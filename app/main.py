@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 from app.core.config import Settings
+from app.db.database import lifespan
 from app.routes.v1 import health_route  
 from app.routes.v1.authentication import authentication_route 
 from app.routes.v1 import user_route
@@ -11,6 +12,7 @@ from app.routes.v1 import training_route
 from app.websockets import signaling
 from app.routes.v1 import blendshapes_route
 from app.routes.v1 import recordings_route
+from app.routes.v1 import jobs_route
 
 settings = Settings()
 
@@ -18,6 +20,7 @@ app = FastAPI(
     title="PitchPilot API",
     description="API backend for the PitchPilot presentation training platform.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # ───────────────────────────────────────────────
@@ -43,6 +46,7 @@ app.include_router(training_route.router, prefix="/api/v1/trainings", tags=["Tra
 app.include_router(signaling.router, prefix="/api/v1/ws/signaling", tags=["Signaling"], include_in_schema=False)
 app.include_router(recordings_route.router, prefix="/api/v1/recordings", tags=["Recordings"])
 app.include_router(blendshapes_route.router, prefix="/api/v1/blendshapes", tags=["Blendshapes"])
+app.include_router(jobs_route.router, prefix="/api/v1/jobs", tags=["Jobs"])
 
 
 
@@ -0,0 +1,37 @@
+from sqlalchemy import Integer, Text, DateTime, Enum as PgEnum, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+from datetime import datetime
+from .base_model import Base
+from app.schemas.job_schema import JobKind, JobStatus
+
+
+class Job(Base):
+    """A unit of background work, claimed by workers with FOR UPDATE SKIP LOCKED."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[JobKind] = mapped_column(PgEnum(JobKind, name="job_kind"), nullable=False)
+    status: Mapped[JobStatus] = mapped_column(
+        PgEnum(JobStatus, name="job_status"), nullable=False, default=JobStatus.pending
+    )
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    result: Mapped[dict] = mapped_column(JSONB, nullable=True, comment="Handler return value once done")
+    error: Mapped[str] = mapped_column(Text, nullable=True, comment="Last error message")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=datetime.utcnow,
+        comment="Earliest time a worker may pick the job up (used for retry backoff)",
+    )
+    leased_until: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+        comment="Running jobs whose lease expired are reclaimed by other workers",
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Integer, String, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from .base_model import Base
+
+
+class LLMCacheEntry(Base):
+    """
+    Result of a deterministic LLM call, keyed by a hash of model, prompt
+    version, schema and input. Second level behind the in-process LRU of
+    `LLMResultCache`.
+    """
+    __tablename__ = "llm_cache"
+    __table_args__ = (
+        Index("ix_llm_cache_expires_at", "expires_at"),
+        Index("ix_llm_cache_last_used_at", "last_used_at"),
+    )
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True, comment="sha256 hex of kind + key parts")
+    kind: Mapped[str] = mapped_column(String(32), nullable=False, comment="LLM call type, e.g. audio_feedback")
+    value: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
@@ -1,10 +1,11 @@
-from sqlalchemy import Integer, String, ForeignKey, Text, DateTime, Float, Enum as PgEnum
+from sqlalchemy import BigInteger, Integer, SmallInteger, String, ForeignKey, Text, DateTime, Float, LargeBinary, Index, Enum as PgEnum
 from sqlalchemy.orm import relationship, mapped_column, Mapped, declarative_base
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB  
 import uuid
 from datetime import datetime
 from .base_model import Base  
 from app.schemas.training_schema import VisibilityMode, DifficultyLevel
+from app.schemas.presentation_schema import ProcessingStatus
 
 class Presentation(Base):
     __tablename__ = "presentations"
@@ -15,6 +16,11 @@ class Presentation(Base):
     description: Mapped[str] = mapped_column(Text, nullable=True)
     tags: Mapped[list[str]] = mapped_column(ARRAY(String), default=[])
     file_url: Mapped[str] = mapped_column(String(255), nullable=True)
+    findings_status: Mapped[ProcessingStatus] = mapped_column(
+        PgEnum(ProcessingStatus, name="processing_status"), nullable=True,
+        comment="State of the background findings generation for the uploaded file",
+    )
+    findings_error: Mapped[str] = mapped_column(Text, nullable=True)
     # DEPRECATED: Remove this in future migration
     # findings: Mapped[dict] = mapped_column(JSONB, default=dict)
 
@@ -56,12 +62,13 @@ class Training(Base):
     eye_calibration: Mapped[dict] = mapped_column(
         JSONB, nullable=True, comment="Raw calibration JSON from frontend"
     )
-    blendshapes: Mapped[list["Blendshape"]] = relationship(
-    "Blendshape",
-    back_populates="training",
-    cascade="all, delete-orphan",
-    lazy="selectin"
-) 
+    blendshape_chunks: Mapped[list["BlendshapeChunk"]] = relationship(
+        "BlendshapeChunk",
+        back_populates="training",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="noload",
+    )
     training_results: Mapped[list["TrainingResult"]] = relationship(
         "TrainingResult",
         back_populates="training",
@@ -92,27 +99,105 @@ class PresentationFinding(Base):
     presentation: Mapped["Presentation"] = relationship("Presentation", back_populates="finding_entries")
 
 
-class Blendshape(Base):
-    __tablename__ = "blendshapes"
+class PresentationFindingEvent(Base):
+    """
+    Progress of the current findings run of a presentation, replayed and
+    pushed to clients by the findings stream. Rows are cleared when a new run
+    starts; `id` doubles as the SSE event id.
+    """
+    __tablename__ = "presentation_finding_events"
+    __table_args__ = (
+        Index("ix_presentation_finding_events_presentation_id_id", "presentation_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    presentation_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("presentations.id", ondelete="CASCADE"), nullable=False
+    )
+    kind: Mapped[str] = mapped_column(String(20), nullable=False, comment="status | slides | scores")
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class SlideFindingsCacheEntry(Base):
+    """
+    LLM findings of a single slide, keyed by a hash of the rendered page, its
+    text, the deck description and the findings prompt version. Shared across
+    presentations, so re-uploading an edited deck only analyses changed pages.
+    """
+    __tablename__ = "slide_findings_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True, comment="sha256 hex of page content + prompt inputs")
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    findings: Mapped[list[dict]] = mapped_column(JSONB, nullable=False, default=list)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class BlendshapeChunk(Base):
+    """
+    N seconds of blendshape frames of one training, packed as float32 scores
+    plus float64 timestamps (see app.utils.eye_tracking.blendshape_codec).
+    """
+    __tablename__ = "blendshape_chunks"
+    __table_args__ = (
+        Index("ix_blendshape_chunks_training_id_start_ts", "training_id", "start_ts"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    
+
     training_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("trainings.id", ondelete="CASCADE"),
         nullable=False
     )
 
-    timestamp: Mapped[float] = mapped_column(
-        Float, nullable=False, comment="Seconds since training start"
+    start_ts: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Timestamp of the first frame, seconds since training start"
     )
-
-    scores: Mapped[dict] = mapped_column(
-        JSONB, nullable=False, comment="Map of blendshape scores, e.g. {'jawOpen': 0.42}"
+    end_ts: Mapped[float] = mapped_column(
+        Float, nullable=False, comment="Timestamp of the last frame"
+    )
+    frame_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    schema_version: Mapped[int] = mapped_column(
+        SmallInteger, nullable=False, comment="Category order of the packed scores"
+    )
+    timestamps: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False, comment="frame_count little-endian float64"
+    )
+    scores: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False, comment="frame_count x categories little-endian float32, row-major"
     )
 
     training: Mapped["Training"] = relationship(
-        "Training", back_populates="blendshapes", lazy="selectin"
+        "Training", back_populates="blendshape_chunks"
+    )
+
+
+class EyeTrackingSummary(Base):
+    """
+    Running heatmap / attention totals of a training, maintained at ingest time
+    so finishing a training does not have to re-read its frames.
+    """
+    __tablename__ = "eye_tracking_summaries"
+
+    training_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("trainings.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    frame_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, comment="Frames folded into this summary"
+    )
+    attention_sum: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0, comment="Sum of per-frame attention scores"
+    )
+    grid_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    heatmap: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=False, comment="grid_size x grid_size little-endian uint32 counts, index [gx, gy]"
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
 
@@ -145,6 +230,10 @@ class TrainingResult(Base):
         Float, nullable=True, comment="Aggregated score from audio analysis"
     )
 
+    slide_scores: Mapped[list[dict]] = mapped_column(
+        JSONB, nullable=True, comment="Per-slide time, attention, heatmap, words, WPM and volume"
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
@@ -1,11 +1,9 @@
-import json
-import uuid
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from app.db.database import get_session
+from app.db.database import get_budgeted_session
 from app.services.blendshapes_service import BlendshapeService
-from app.models.presentation_model import Blendshape
+from app.websockets.blendshape_ingest import BlendshapeIngestConnection
 from pydantic import BaseModel, Field
 from typing import List
 from app.schemas.blendshapes_schema import BlendshapeOut
@@ -19,44 +17,16 @@ class BlendshapeInput(BaseModel):
 
 
 @router.websocket("/ws/add")
-async def stream_blendshapes_batch(
-    websocket: WebSocket,
-    db: AsyncSession = Depends(get_session)
-):
-    await websocket.accept()
-    service = BlendshapeService(db)
-
-    buffer = []
-    BATCH_SIZE = 30  
-
-    try:
-        while True:
-            message = await websocket.receive_text()
-            try:
-                payload = json.loads(message)
-                buffer.append({
-                    "training_id": uuid.UUID(payload["training_id"]),
-                    "timestamp": payload["timestamp"],
-                    "scores": payload["scores"],
-                })
-
-                if len(buffer) >= BATCH_SIZE:
-                    await service.add_blendshapes_bulk(buffer)
-                    buffer.clear()
-
-            except Exception as e:
-                print(f"[WS] Error parsing message: {e}")
-    except WebSocketDisconnect:
-        print("[WS] Disconnected, flushing buffer...")
-        if buffer:
-            await service.add_blendshapes_bulk(buffer)
+async def stream_blendshapes_batch(websocket: WebSocket):
+    """Live blendshape ingest; see app.websockets.blendshape_ingest for the protocol."""
+    await BlendshapeIngestConnection(websocket).run()
 
 
 
 @router.get("/{training_id}", response_model=List[BlendshapeOut])
 async def get_blendshapes_by_training(
     training_id: UUID,
-    db: AsyncSession = Depends(get_session)
+    db: AsyncSession = Depends(get_budgeted_session("blendshapes_read"))
 ):
     service = BlendshapeService(db)
     frames = await service.get_blendshapes_by_training(training_id)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.services.health_service import perform_health_check
+from app.services.health_service import perform_health_check, get_db_pool_status
 from app.schemas.health_schema import HealthResponse
 
 router = APIRouter()
@@ -13,3 +13,13 @@ router = APIRouter()
 )
 async def health_check():
     return perform_health_check()
+
+
+@router.get(
+    "/health/db-pool",
+    summary="Database pool usage",
+    description="Connection pool checkouts, per-endpoint pool budgets and blendshape writer throughput.",
+    tags=["System"]
+)
+async def db_pool_status():
+    return get_db_pool_status()
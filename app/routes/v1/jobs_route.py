@@ -0,0 +1,20 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import get_session
+from app.schemas.job_schema import JobOut
+from app.services.jobs.job_service import JobService
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job_status(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_session),
+):
+    job = await JobService(db).get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,8 +1,12 @@
+import asyncio
+import json
 from typing import List
-from fastapi import APIRouter, Depends, File, Form, HTTPException, status, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Request, status, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.database import get_session
+from app.core.config import settings
+from app.db.database import budgeted_session, get_session
 from app.services.presentation.presentation_service import PresentationService
 from app.schemas.presentation_schema import PresentationCreate, PresentationOut
 from app.models.user_model import User
@@ -11,11 +15,16 @@ from app.models.presentation_model import Presentation, PresentationFinding, Tra
 from sqlalchemy.orm import selectinload
 from app.utils.minio_helper import upload_file_to_minio
 from uuid import UUID
-from app.utils.findings.findings_generator import process_presentation_file
-from app.services.findings.findings_service import FindingService
-from app.utils.findings.calculator import filter_findings
 from app.models.presentation_model import TrainingResult
-from app.schemas.presentation_schema import LatestTrainingAnalyticsOut
+from app.schemas.presentation_schema import LatestTrainingAnalyticsOut, ProcessingStatus
+from app.schemas.job_schema import JobKind
+from app.services.jobs.job_service import JobService
+from app.services.findings.finding_events import (
+    SCORES_EVENT,
+    STATUS_EVENT,
+    FindingEventService,
+    finding_event_listener,
+)
 
 
 router = APIRouter()
@@ -23,7 +32,7 @@ router = APIRouter()
 
 
 
-from io import BytesIO
+from fastapi.concurrency import run_in_threadpool
 
 
 @router.post("/add-presentation", response_model=PresentationOut, status_code=status.HTTP_201_CREATED)
@@ -35,17 +44,18 @@ async def create_presentation(
     db: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    file_bytes = await file.read()  
-    file_buffer = BytesIO(file_bytes)
-    file_url = upload_file_to_minio(
-        file_buffer=file_buffer,  
+    """
+    Store the PDF and return immediately. Findings are generated by the job
+    worker; `findings_status` tracks progress (pending → running → done/failed).
+    """
+    # UploadFile is spooled to disk past 1 MB; stream it instead of reading it into memory
+    file_url = await run_in_threadpool(
+        upload_file_to_minio,
+        file_buffer=file.file,
         filename=file.filename,
         content_type=file.content_type,
     )
 
-    
-    findings_result = process_presentation_file(file_buffer, descrption=description)  
-
     presentation_service = PresentationService(db)
     presentation = await presentation_service.create_presentation(
         user_id=current_user.id,
@@ -53,18 +63,19 @@ async def create_presentation(
             "name": name,
             "description": description,
             "tags": tags,
-            "file_url": file_url
+            "file_url": file_url,
+            "findings_status": ProcessingStatus.pending,
         }
     )
 
-    filtered_findings = filter_findings(findings_result)
-    finding_service = FindingService(db)
-    await finding_service.create_finding(
-        presentation_id=presentation.id,
-        findings=filtered_findings,
-        is_active=True
+    await JobService(db).enqueue(
+        JobKind.presentation_findings,
+        {
+            "presentation_id": presentation.id,
+            "file_url": file_url,
+            "description": description,
+        },
     )
-    await db.commit()
 
     result = await db.execute(
         select(Presentation)
@@ -133,6 +144,61 @@ async def get_active_finding(
 
     return finding
 
+@router.get("/{presentation_id}/findings/stream")
+async def stream_findings(
+    presentation_id: UUID,
+    request: Request,
+    last_event_id: int = Header(0),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Server-Sent Events of the current findings run: `status`, one `slides`
+    event per analysed chunk (filtered like the stored finding) and a final
+    `scores` event. Events of a run in progress are replayed first; EventSource
+    reconnects resume after Last-Event-ID. The stream ends after `scores` or a
+    failed `status`.
+    """
+    presentation = await db.get(Presentation, presentation_id)
+    if not presentation or presentation.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Presentation not found or not yours")
+    findings_status = presentation.findings_status
+    # Hand the connection back to the pool; the stream uses short sessions
+    await db.commit()
+
+    def is_final(kind: str, data: dict) -> bool:
+        return kind == SCORES_EVENT or (kind == STATUS_EVENT and data.get("status") == ProcessingStatus.failed)
+
+    async def events():
+        after = last_event_id
+        async with finding_event_listener.subscribe(presentation_id) as wake:
+            while True:
+                wake.clear()
+                async with budgeted_session("findings_stream") as stream_db:
+                    new_events = await FindingEventService(stream_db).events_after(presentation_id, after)
+                for event in new_events:
+                    after = event.id
+                    yield f"id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.data)}\n\n"
+                    if is_final(event.kind, event.data):
+                        return
+                # Finished before events were recorded: nothing will follow
+                if not after and findings_status in (ProcessingStatus.done, ProcessingStatus.failed):
+                    yield f"event: {STATUS_EVENT}\ndata: {json.dumps({'status': findings_status.value})}\n\n"
+                    return
+                if await request.is_disconnected():
+                    return
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=settings.FINDINGS_STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{presentation_id}/get-finding-bars")
 async def get_finding_bars(
     presentation_id: UUID,
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 
 from app.db.database import get_session
-from app.models.presentation_model import Presentation, Training
+from app.models.presentation_model import Presentation, Training, TrainingResult
 from app.models.user_model import User
 from app.dependencies.auth_dep import get_current_user
 from app.schemas.presentation_schema import PresentationOut
+from app.schemas.training_results_schema import HeatmapOut, SlideAnalyticsOut
 from app.schemas.training_schema import TrainingCreate, TrainingOut, TrainingScorePatch
 from app.services.training.training_service import TrainingService
+from app.utils.eye_tracking.heatmap_codec import decode_heatmap, heatmap_at_size, render_heatmap_png
 
 router = APIRouter()
 
@@ -105,4 +109,67 @@ async def get_training_flight_log(
         raise HTTPException(status_code=404, detail="Training not found")
     return training
 
+async def _latest_result(db: AsyncSession, training_id: UUID, user: User) -> TrainingResult | None:
+    stmt = (
+        select(TrainingResult)
+        .join(Training, Training.id == TrainingResult.training_id)
+        .join(Presentation, Presentation.id == Training.presentation_id)
+        .where(TrainingResult.training_id == training_id, Presentation.user_id == user.id)
+        .order_by(TrainingResult.created_at.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+@router.get("/{training_id}/slide-analytics", response_model=SlideAnalyticsOut)
+async def get_slide_analytics(
+    training_id: UUID,
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    result = await _latest_result(db, training_id, current_user)
+    if result is None or result.slide_scores is None:
+        raise HTTPException(status_code=404, detail="No slide analytics for this training")
+    return {"training_id": training_id, "slides": result.slide_scores}
+
+@router.get(
+    "/{training_id}/heatmap",
+    response_model=HeatmapOut,
+    responses={200: {"content": {"image/png": {}}}},
+)
+async def get_heatmap(
+    training_id: UUID,
+    size: Optional[int] = Query(None, ge=1, description="Grid resolution; defaults to the stored one"),
+    page: Optional[int] = Query(None, description="Heatmap of a single slide instead of the whole session"),
+    format: Literal["json", "png"] = Query("json"),
+    cell_px: int = Query(8, ge=1, le=64, description="Pixels per grid cell for PNG output"),
+    db: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    result = await _latest_result(db, training_id, current_user)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No results for this training")
+
+    if page is None:
+        payload = result.eye_tracking_scores
+    else:
+        slide = next((s for s in result.slide_scores or [] if s["page"] == page), None)
+        payload = slide["heatmap"] if slide else None
+    if not payload:
+        raise HTTPException(status_code=404, detail="No heatmap for this training")
+
+    try:
+        counts = heatmap_at_size(payload, size) if size else decode_heatmap(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
+    if format == "png":
+        png = await run_in_threadpool(render_heatmap_png, counts, cell_px)
+        return Response(content=png, media_type="image/png")
+    return {
+        "training_id": training_id,
+        "page": page,
+        "size": counts.shape[0],
+        "frames": int(counts.sum()),
+        "counts": counts.tolist(),
+    }
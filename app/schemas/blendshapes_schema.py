@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 class BlendshapeEntry(BaseModel):
@@ -9,7 +9,7 @@ class BlendshapeEntry(BaseModel):
     displayName: str
 
 class BlendshapeOut(BaseModel):
-    id: UUID
+    id: Optional[UUID] = None  # frames are stored in packed chunks and have no row id
     training_id: UUID
     timestamp: float
     scores: List[BlendshapeEntry]
@@ -0,0 +1,37 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    done    = "done"
+    failed  = "failed"
+
+
+class JobKind(str, Enum):
+    finish_recording      = "finish_recording"
+    presentation_findings = "presentation_findings"
+
+
+class JobEnqueued(BaseModel):
+    job_id: UUID
+    status: JobStatus
+
+
+class JobOut(BaseModel):
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    attempts: int
+    error: Optional[str]
+    result: Optional[dict]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
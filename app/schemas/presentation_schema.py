@@ -2,8 +2,15 @@ from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 import uuid
 from datetime import datetime
+from enum import Enum
 from app.schemas.training_schema import TrainingOut, TrainingOutSlim  
 
+class ProcessingStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    done    = "done"
+    failed  = "failed"
+
 class PresentationCreate(BaseModel):
     name: str = Field(..., max_length=100)
     description: Optional[str]
@@ -30,6 +37,8 @@ class PresentationOut(BaseModel):
     description: Optional[str]
     tags: List[str]
     file_url: Optional[str]
+    findings_status: Optional[ProcessingStatus] = None
+    findings_error: Optional[str] = None
     trainings: List[TrainingOut] = []
     finding_entries: List[PresentationFindingOut] = []
 
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
+from app.utils.eye_tracking.heatmap_codec import legacy_heatmap
+
 class TrainingResultCreate(BaseModel):
     training_id: UUID
     eye_tracking_scores: Optional[dict] = Field(
@@ -25,6 +27,46 @@ class TrainingResultOut(BaseModel):
     eye_tracking_total_score: Optional[float]
     audio_scores: Optional[dict]
     audio_total_score: Optional[float]
+    slide_scores: Optional[List[dict]] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("eye_tracking_scores", mode="before")
+    @classmethod
+    def expand_heatmap(cls, value):
+        return legacy_heatmap(value)
+
+    @field_validator("slide_scores", mode="before")
+    @classmethod
+    def expand_slide_heatmaps(cls, value):
+        if not value:
+            return value
+        return [{**slide, "heatmap": legacy_heatmap(slide.get("heatmap"))} for slide in value]
+
+class SlideAnalytics(BaseModel):
+    page: int
+    visits: int
+    seconds: float
+    frames: int
+    attention_score: Optional[float]
+    heatmap: dict
+    words: int
+    wpm: float
+    avg_volume_dbfs: Optional[float]
+
+    @field_validator("heatmap", mode="before")
+    @classmethod
+    def expand_heatmap(cls, value):
+        return legacy_heatmap(value)
+
+class SlideAnalyticsOut(BaseModel):
+    training_id: UUID
+    slides: List[SlideAnalytics]
+
+class HeatmapOut(BaseModel):
+    training_id: UUID
+    page: Optional[int] = None
+    size: int
+    frames: int
+    counts: List[List[int]] = Field(..., description="size x size frame counts, index [gx][gy]")
@@ -11,8 +11,13 @@ class VisibilityMode(str, Enum):
     private = "private"
     
 class SlideEvent(BaseModel):
-    timestamp: float
-    page: int
+    """
+    A slide change. Timestamps use the blendshape frame clock (seconds since
+    training start); the first event marks the start of the recording, i.e.
+    t = 0 of the audio analysis.
+    """
+    timestamp: float = Field(..., ge=0, description="Seconds since training start, same clock as the blendshape frames")
+    page: int = Field(..., description="Page shown from this timestamp on")
 
 class DifficultyLevel(str, Enum):
     easy   = "easy"
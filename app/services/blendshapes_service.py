@@ -1,33 +1,229 @@
 # app/services/blendshape_service.py
 
 import uuid
-from fastapi.encoders import jsonable_encoder
+from typing import AsyncIterator
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.presentation_model import  Blendshape
+from app.core.config import settings
+from app.models.presentation_model import BlendshapeChunk, EyeTrackingSummary
+from app.utils.eye_tracking.blendshape_categories import BLENDSHAPE_CATEGORIES
+from app.utils.eye_tracking.blendshape_codec import (
+    BLENDSHAPE_SCHEMA_VERSION,
+    matrix_to_score_lists,
+    pack_frames,
+    unpack_frames,
+)
+from app.utils.eye_tracking.eye_tracking import EyeTrackingAccumulator
 
 
 class BlendshapeService:
+    CHUNK_COLUMNS = (
+        "id", "training_id", "start_ts", "end_ts",
+        "frame_count", "schema_version", "timestamps", "scores",
+    )
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def add_blendshapes_bulk(self, items: list[dict]) -> None:
-        objects = [
-            Blendshape(
-                training_id=item["training_id"],
-                timestamp=item["timestamp"],
-                scores=jsonable_encoder(item["scores"]),
+    @staticmethod
+    def chunk_record(
+        training_id: uuid.UUID, timestamps: np.ndarray, matrix: np.ndarray
+    ) -> tuple:
+        """One `blendshape_chunks` row as a COPY record in CHUNK_COLUMNS order."""
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, matrix = timestamps[order], matrix[order]
+        packed_ts, packed_scores = pack_frames(timestamps, matrix)
+        return (
+            uuid.uuid4(),
+            training_id,
+            float(timestamps[0]),
+            float(timestamps[-1]),
+            len(timestamps),
+            BLENDSHAPE_SCHEMA_VERSION,
+            packed_ts,
+            packed_scores,
+        )
+
+    async def copy_chunk_records(self, records: list[tuple], commit: bool = True) -> None:
+        """
+        Write chunk records with asyncpg's binary COPY on the session's
+        connection (and commit). Bypasses the ORM unit of work entirely.
+        """
+        if not records:
+            return
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            BlendshapeChunk.__tablename__,
+            records=records,
+            columns=self.CHUNK_COLUMNS,
+        )
+        if commit:
+            await self.db.commit()
+
+    async def get_blendshape_matrix(
+        self, training_id: uuid.UUID
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """All frames of a training as (timestamps, matrix), ordered by timestamp."""
+        rows = (
+            await self.db.execute(
+                select(
+                    BlendshapeChunk.timestamps,
+                    BlendshapeChunk.scores,
+                    BlendshapeChunk.schema_version,
+                )
+                .where(BlendshapeChunk.training_id == training_id)
+                .order_by(BlendshapeChunk.start_ts.asc())
+            )
+        ).all()
+        if not rows:
+            return np.zeros(0, dtype=np.float64), np.zeros((0, len(BLENDSHAPE_CATEGORIES)), dtype=np.float32)
+
+        parts = [unpack_frames(ts, scores, version) for ts, scores, version in rows]
+        timestamps = np.concatenate([p[0] for p in parts])
+        matrix = np.concatenate([p[1] for p in parts])
+        # Chunks from reconnects may overlap in time
+        if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, matrix = timestamps[order], matrix[order]
+        return timestamps, matrix
+
+    async def iter_blendshape_chunks(
+        self, training_id: uuid.UUID, from_ts: float | None = None
+    ) -> AsyncIterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Frames of a training one stored chunk at a time, in start order, via a
+        server-side cursor. `from_ts` skips chunks that end before it.
+        """
+        stmt = (
+            select(
+                BlendshapeChunk.timestamps,
+                BlendshapeChunk.scores,
+                BlendshapeChunk.schema_version,
             )
-            for item in items
-        ]
-        self.db.add_all(objects)
-        await self.db.commit()
-        
+            .where(BlendshapeChunk.training_id == training_id)
+            .order_by(BlendshapeChunk.start_ts.asc())
+        )
+        if from_ts is not None:
+            stmt = stmt.where(BlendshapeChunk.end_ts >= from_ts)
+        result = await self.db.stream(stmt)
+        async for ts, scores, version in result:
+            yield unpack_frames(ts, scores, version)
+
     async def get_blendshapes_by_training(
         self, training_id: uuid.UUID
-    ) -> list[Blendshape]:
-        from sqlalchemy import select
+    ) -> list[dict]:
+        """Frames expanded back into the per-frame MediaPipe shape."""
+        timestamps, matrix = await self.get_blendshape_matrix(training_id)
+        return [
+            {"training_id": training_id, "timestamp": ts, "scores": scores}
+            for ts, scores in zip(timestamps.tolist(), matrix_to_score_lists(matrix))
+        ]
+
+    async def merge_eye_tracking_summaries(
+        self, deltas: dict[uuid.UUID, EyeTrackingAccumulator]
+    ) -> None:
+        """
+        Add ingest-time accumulators onto the stored per-training summaries.
+        Rows are locked in training id order, so concurrent writers cannot
+        deadlock. The caller commits.
+        """
+        if not deltas:
+            return
+        training_ids = sorted(deltas, key=str)
+        await self.db.execute(
+            insert(EyeTrackingSummary)
+            .values([
+                {
+                    "training_id": training_id,
+                    "frame_count": 0,
+                    "attention_sum": 0.0,
+                    "grid_size": deltas[training_id].grid_size,
+                    "heatmap": EyeTrackingAccumulator(deltas[training_id].grid_size).packed_heatmap(),
+                }
+                for training_id in training_ids
+            ])
+            .on_conflict_do_nothing(index_elements=["training_id"])
+        )
+        summaries = (
+            await self.db.execute(
+                select(EyeTrackingSummary)
+                .where(EyeTrackingSummary.training_id.in_(training_ids))
+                .order_by(EyeTrackingSummary.training_id)
+                .with_for_update()
+            )
+        ).scalars().all()
+        for summary in summaries:
+            acc = EyeTrackingAccumulator.from_packed(
+                summary.grid_size, summary.heatmap, summary.attention_sum, summary.frame_count
+            )
+            acc.merge(deltas[summary.training_id])
+            summary.heatmap = acc.packed_heatmap()
+            summary.attention_sum = acc.attention_sum
+            summary.frame_count = acc.frame_count
+        await self.db.flush()
+
+    async def get_eye_tracking_result(self, training_id: uuid.UUID) -> tuple[dict, float]:
+        """
+        Heatmap and attention score of a training.
+
+        Served from the ingest-time summary, which the writer updates in the
+        same transaction as every chunk COPY. Only when it does not cover the
+        stored frames (a training from before summaries existed, or chunks
+        written another way) are the frames re-read once and the summary
+        rebuilt.
+        """
+        stored_frames = await self.count_frames(training_id)
+        summary = await self.db.get(EyeTrackingSummary, training_id)
+        if summary is not None and summary.frame_count == stored_frames:
+            return EyeTrackingAccumulator.from_packed(
+                summary.grid_size, summary.heatmap, summary.attention_sum, summary.frame_count
+            ).result()
+
+        # Rebuild under the same row lock `merge_eye_tracking_summaries` takes,
+        # so a concurrent merge is neither lost nor counted twice.
+        await self.db.execute(
+            insert(EyeTrackingSummary)
+            .values(
+                training_id=training_id,
+                frame_count=0,
+                attention_sum=0.0,
+                grid_size=settings.EYE_TRACKING_GRID_SIZE,
+                heatmap=EyeTrackingAccumulator(settings.EYE_TRACKING_GRID_SIZE).packed_heatmap(),
+            )
+            .on_conflict_do_nothing(index_elements=["training_id"])
+        )
+        summary = (
+            await self.db.execute(
+                select(EyeTrackingSummary)
+                .where(EyeTrackingSummary.training_id == training_id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+        ).scalar_one()
+        stored_frames = await self.count_frames(training_id)
+        if summary.frame_count == stored_frames:
+            acc = EyeTrackingAccumulator.from_packed(
+                summary.grid_size, summary.heatmap, summary.attention_sum, summary.frame_count
+            )
+            await self.db.commit()
+            return acc.result()
+
+        _, matrix = await self.get_blendshape_matrix(training_id)
+        acc = EyeTrackingAccumulator(settings.EYE_TRACKING_GRID_SIZE)
+        acc.update(matrix)
+        summary.grid_size = acc.grid_size
+        summary.heatmap = acc.packed_heatmap()
+        summary.attention_sum = acc.attention_sum
+        summary.frame_count = acc.frame_count
+        await self.db.commit()
+        return acc.result()
 
-        result = await self.db.execute(
-            select(Blendshape).where(Blendshape.training_id == training_id)
+    async def count_frames(self, training_id: uuid.UUID) -> int:
+        return await self.db.scalar(
+            select(func.coalesce(func.sum(BlendshapeChunk.frame_count), 0))
+            .where(BlendshapeChunk.training_id == training_id)
         )
-        return result.scalars().all()
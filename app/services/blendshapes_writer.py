@@ -0,0 +1,208 @@
+# app/services/blendshapes_writer.py
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.database import async_session
+from app.services.blendshapes_service import BlendshapeService
+from app.utils.eye_tracking.eye_tracking import EyeTrackingAccumulator
+
+
+@dataclass
+class _PendingChunk:
+    record: tuple
+    training_id: uuid.UUID
+    frames: int
+    summary: EyeTrackingAccumulator
+    future: asyncio.Future
+
+
+class BlendshapeBulkWriter:
+    """
+    Process-wide batcher for blendshape chunks.
+
+    Live sessions `submit` finished chunks; a single background task writes
+    everything pending with one binary COPY once BLENDSHAPE_COPY_MAX_ROWS rows
+    are queued, the oldest row waited BLENDSHAPE_COPY_MAX_SECONDS, or a
+    session submitted its final chunk. Each submit returns a future that
+    resolves once its row is committed. If the batch fails, it is retried
+    with one transaction per training, so only the futures of the training
+    at fault fail.
+
+    Every chunk is also folded into an eye-tracking accumulator for its
+    training, and the accumulators of a batch are merged into
+    `eye_tracking_summaries` in the same transaction as its COPY. A summary
+    row therefore always covers exactly the committed chunks; there is no
+    in-memory state that a rebuild of the row could count twice.
+
+    Connections are only checked out for the duration of a COPY, so the
+    number of open sockets is independent of the pool size. The single writer
+    task holds at most one connection at a time, so it takes no pool budget;
+    `blendshapes_ingest` caps the training lookups of connecting sockets.
+    """
+
+    def __init__(
+        self,
+        max_rows: int = settings.BLENDSHAPE_COPY_MAX_ROWS,
+        max_seconds: float = settings.BLENDSHAPE_COPY_MAX_SECONDS,
+    ):
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self._pending: list[_PendingChunk] = []
+        self._oldest: float | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+        self.rows_written = 0
+        self.frames_written = 0
+        self.copy_seconds = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="blendshape-bulk-writer")
+
+    def submit(
+        self, training_id: uuid.UUID, timestamps: np.ndarray, matrix: np.ndarray, final: bool = False
+    ) -> asyncio.Future:
+        """
+        Queue one chunk. `final=True` marks the last chunk of a session: it is
+        written right away instead of waiting for BLENDSHAPE_COPY_MAX_SECONDS,
+        so a finish right after finds the chunks and the summary complete.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        if not len(timestamps):
+            future.set_result(None)
+            return future
+        summary = EyeTrackingAccumulator(settings.EYE_TRACKING_GRID_SIZE)
+        summary.update(matrix)
+        self._pending.append(_PendingChunk(
+            record=BlendshapeService.chunk_record(training_id, timestamps, matrix),
+            training_id=training_id,
+            frames=len(timestamps),
+            summary=summary,
+            future=future,
+        ))
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        if final or len(self._pending) >= self.max_rows:
+            self._wakeup.set()
+        return future
+
+    async def _run(self) -> None:
+        while not self._closing:
+            timeout = self.max_seconds
+            if self._oldest is not None:
+                timeout = max(0.0, self._oldest + self.max_seconds - time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            self._oldest = None
+            return 0
+        batch, self._pending, self._oldest = self._pending, [], None
+        records = [chunk.record for chunk in batch]
+
+        summaries: dict[uuid.UUID, EyeTrackingAccumulator] = {}
+        for chunk in batch:
+            if chunk.training_id in summaries:
+                summaries[chunk.training_id].merge(chunk.summary)
+            else:
+                summaries[chunk.training_id] = chunk.summary
+
+        started = time.perf_counter()
+        failed: dict[uuid.UUID, Exception] = {}
+        try:
+            await self._write(records, summaries)
+        except Exception as e:
+            print(f"[COPY] Writing {len(records)} blendshape chunks failed: {e}")
+            failed = await self._write_per_training(batch, summaries, e)
+
+        elapsed = time.perf_counter() - started
+        written = [chunk for chunk in batch if chunk.training_id not in failed]
+        frames = sum(chunk.frames for chunk in written)
+        self.rows_written += len(written)
+        self.frames_written += frames
+        self.copy_seconds += elapsed
+        for chunk in batch:
+            if chunk.future.done():
+                continue
+            if chunk.training_id in failed:
+                chunk.future.set_exception(failed[chunk.training_id])
+            else:
+                chunk.future.set_result(None)
+        if settings.DEBUG and written:
+            print(
+                f"[COPY] {len(written)} chunks / {frames} frames in {elapsed * 1000:.1f} ms "
+                f"({len(written) / elapsed:.0f} rows/s, {frames / elapsed:.0f} frames/s, "
+                f"{len(summaries) - len(failed)} summaries merged)"
+            )
+        return len(written)
+
+    async def _write(self, records: list[tuple], summaries: dict[uuid.UUID, EyeTrackingAccumulator]) -> None:
+        async with async_session() as db:
+            service = BlendshapeService(db)
+            await service.copy_chunk_records(records, commit=False)
+            await service.merge_eye_tracking_summaries(summaries)
+            await db.commit()
+
+    async def _write_per_training(
+        self,
+        batch: list[_PendingChunk],
+        summaries: dict[uuid.UUID, EyeTrackingAccumulator],
+        error: Exception,
+    ) -> dict[uuid.UUID, Exception]:
+        """
+        Retry a failed batch with one transaction per training, so a single
+        bad training does not fail every session sharing the COPY. Returns the
+        trainings that still failed, with their error.
+        """
+        records: dict[uuid.UUID, list[tuple]] = {}
+        for chunk in batch:
+            records.setdefault(chunk.training_id, []).append(chunk.record)
+        if len(records) <= 1:
+            return dict.fromkeys(records, error)
+
+        failed: dict[uuid.UUID, Exception] = {}
+        for training_id, training_records in records.items():
+            try:
+                await self._write(training_records, {training_id: summaries[training_id]})
+            except Exception as e:
+                print(f"[COPY] Writing blendshape chunks of training {training_id} failed: {e}")
+                failed[training_id] = e
+        return failed
+
+    def stats(self) -> dict:
+        return {
+            "pending_rows": len(self._pending),
+            "rows_written": self.rows_written,
+            "frames_written": self.frames_written,
+            "rows_per_second": self.rows_written / self.copy_seconds if self.copy_seconds else 0.0,
+            "frames_per_second": self.frames_written / self.copy_seconds if self.copy_seconds else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Write whatever is still pending and stop the background task."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        self._closing = False
+
+
+blendshape_writer = BlendshapeBulkWriter()
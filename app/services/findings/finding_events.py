@@ -0,0 +1,115 @@
+# app/services/findings/finding_events.py
+
+"""
+Progress events of a findings run, for the SSE stream of a presentation.
+
+The job worker `publish`es rows into `presentation_finding_events` and sends
+a Postgres NOTIFY on FINDINGS_EVENT_CHANNEL in the same transaction. Every API
+process keeps one LISTEN connection (`finding_event_listener`) that wakes the
+streams of the notified presentation, which then read the new rows. Clients
+reconnecting with Last-Event-ID resume from the table.
+"""
+
+import asyncio
+import contextlib
+import uuid
+from collections import defaultdict
+from typing import AsyncIterator
+
+import asyncpg
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.presentation_model import PresentationFindingEvent
+
+FINDINGS_EVENT_CHANNEL = "presentation_findings"
+
+STATUS_EVENT = "status"
+SLIDES_EVENT = "slides"
+SCORES_EVENT = "scores"
+
+
+class FindingEventService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def clear(self, presentation_id: uuid.UUID) -> None:
+        """Forget the events of earlier runs."""
+        await self.db.execute(
+            delete(PresentationFindingEvent).where(PresentationFindingEvent.presentation_id == presentation_id)
+        )
+        await self.db.commit()
+
+    async def publish(self, presentation_id: uuid.UUID, kind: str, data: dict) -> None:
+        self.db.add(PresentationFindingEvent(
+            presentation_id=presentation_id, kind=kind, data=jsonable_encoder(data)
+        ))
+        await self.db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": FINDINGS_EVENT_CHANNEL, "payload": str(presentation_id)},
+        )
+        await self.db.commit()
+
+    async def events_after(self, presentation_id: uuid.UUID, after_id: int = 0) -> list[PresentationFindingEvent]:
+        result = await self.db.execute(
+            select(PresentationFindingEvent)
+            .where(
+                PresentationFindingEvent.presentation_id == presentation_id,
+                PresentationFindingEvent.id > after_id,
+            )
+            .order_by(PresentationFindingEvent.id)
+        )
+        return list(result.scalars().all())
+
+
+class FindingEventListener:
+    """
+    One LISTEN connection per API process, fanned out to the open streams.
+    The connection is opened by the first subscriber and re-opened if it died;
+    streams additionally re-check the table every
+    FINDINGS_STREAM_KEEPALIVE_SECONDS, so a lost notification only delays.
+    """
+
+    def __init__(self):
+        self._conn: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._subscribers: dict[str, set[asyncio.Event]] = defaultdict(set)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        for wake in self._subscribers.get(payload, ()):
+            wake.set()
+
+    async def _ensure_connection(self) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            try:
+                self._conn = await asyncpg.connect(settings.POSTGRES_URL.replace("+asyncpg", ""))
+                await self._conn.add_listener(FINDINGS_EVENT_CHANNEL, self._on_notify)
+            except (OSError, asyncpg.PostgresError) as e:
+                self._conn = None
+                print(f"[FINDINGS] LISTEN unavailable, streams fall back to polling: {e}")
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, presentation_id: uuid.UUID) -> AsyncIterator[asyncio.Event]:
+        """Event that is set whenever new events of `presentation_id` were published."""
+        await self._ensure_connection()
+        key = str(presentation_id)
+        wake = asyncio.Event()
+        self._subscribers[key].add(wake)
+        try:
+            yield wake
+        finally:
+            self._subscribers[key].discard(wake)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+    async def close(self) -> None:
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+
+finding_event_listener = FindingEventListener()
@@ -4,8 +4,26 @@ import uuid
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update
+import asyncio
+from app.core.config import settings
+from app.db.database import async_session
 from app.models.presentation_model import PresentationFinding
-from app.utils.findings.calculator import calculate_scores
+from app.schemas.findings_schema import SlideFindings
+from app.schemas.job_schema import JobKind
+from app.schemas.presentation_schema import ProcessingStatus
+from app.services.findings.finding_events import (
+    SCORES_EVENT,
+    SLIDES_EVENT,
+    STATUS_EVENT,
+    FindingEventService,
+)
+from app.services.findings.slide_findings_cache import SlideFindingsCache
+from app.services.jobs.job_service import JobService
+from app.services.llm_cache import llm_result_cache
+from app.services.presentation.presentation_service import PresentationService
+from app.utils.findings.calculator import calculate_scores, filter_findings
+from app.utils.findings.findings_generator import process_presentation_file
+from app.utils.minio_helper import download_object_to_tmpfile, object_key_from_public_url
 
 class FindingService:
     def __init__(self, db: AsyncSession):
@@ -40,3 +58,101 @@ class FindingService:
         await self.db.commit()
         await self.db.refresh(new_finding)
         return new_finding
+
+    async def publish_event(self, presentation_id: uuid.UUID, kind: str, data: dict) -> None:
+        """
+        Best effort: streaming is a convenience, a failed publish must not fail
+        the run. Uses its own session because chunk calls publish concurrently.
+        """
+        try:
+            async with async_session() as db:
+                await FindingEventService(db).publish(presentation_id, kind, data)
+        except Exception as e:
+            print(f"[FINDINGS] could not publish {kind} event for {presentation_id}: {e}")
+
+    async def mark_failed(self, presentation_id: uuid.UUID, error: str) -> None:
+        """Final failure of the findings run: no more retries will follow."""
+        await PresentationService(self.db).set_findings_status(presentation_id, ProcessingStatus.failed, error)
+        await self.publish_event(presentation_id, STATUS_EVENT, {"status": ProcessingStatus.failed, "error": error})
+
+    async def generate_findings(
+        self,
+        presentation_id: uuid.UUID,
+        file_url: str,
+        description: str,
+        partial: bool = True,
+        final_attempt: bool = True,
+    ) -> dict:
+        """
+        Background counterpart of the upload: fetch the stored PDF, let the LLM
+        analyse it chunk by chunk and activate the resulting finding. Progress
+        (filtered slides per chunk, then the scores) is published for the
+        findings stream.
+
+        With FINDINGS_PARTIAL_AFTER_SECONDS and `partial`, slow chunks do not
+        hold up the result: the finding is stored with their pages under
+        "pending_pages" and a follow-up run (which takes the finished pages
+        from the slide cache) completes it.
+
+        A failure before the `final_attempt` leaves the presentation `pending`
+        (with the error recorded) because the job queue will run it again.
+        """
+        presentation_service = PresentationService(self.db)
+        await presentation_service.set_findings_status(presentation_id, ProcessingStatus.running)
+        await FindingEventService(self.db).clear(presentation_id)
+        await self.publish_event(presentation_id, STATUS_EVENT, {"status": ProcessingStatus.running})
+
+        async def on_slides(slides: list[SlideFindings]) -> None:
+            await self.publish_event(presentation_id, SLIDES_EVENT, filter_findings({"slides": slides}))
+
+        try:
+            pdf_path = await asyncio.to_thread(
+                download_object_to_tmpfile, object_key_from_public_url(file_url), ".pdf"
+            )
+            try:
+                findings_result = await process_presentation_file(
+                    pdf_path, description, cache=SlideFindingsCache(self.db), on_slides=on_slides,
+                    partial_after=settings.FINDINGS_PARTIAL_AFTER_SECONDS if partial else None,
+                    llm_cache=llm_result_cache,
+                )
+            finally:
+                pdf_path.unlink(missing_ok=True)
+            filtered_findings = filter_findings(findings_result)
+            pending_pages = findings_result.get("pending_pages", [])
+            if pending_pages:
+                filtered_findings["pending_pages"] = pending_pages
+            finding = await self.create_finding(
+                presentation_id=presentation_id,
+                findings=filtered_findings,
+                is_active=True
+            )
+        except Exception as e:
+            await self.db.rollback()
+            error = f"{type(e).__name__}: {e}"
+            if final_attempt:
+                await self.mark_failed(presentation_id, error)
+            else:
+                await presentation_service.set_findings_status(presentation_id, ProcessingStatus.pending, error)
+                await self.publish_event(
+                    presentation_id, STATUS_EVENT, {"status": ProcessingStatus.pending, "error": error, "retrying": True}
+                )
+            raise
+
+        await presentation_service.set_findings_status(presentation_id, ProcessingStatus.done)
+        await self.publish_event(presentation_id, SCORES_EVENT, {
+            "finding_id": finding.id,
+            "total_score": finding.total_score,
+            "preflight_check_score": finding.preflight_check_score,
+            "altitude_score": finding.altitude_score,
+            "flight_path_score": finding.flight_path_score,
+            "cockpit_score": finding.cockpit_score,
+            "pending_pages": pending_pages,
+        })
+        if pending_pages:
+            await JobService(self.db).enqueue(JobKind.presentation_findings, {
+                "presentation_id": presentation_id,
+                "file_url": file_url,
+                "description": description,
+                "partial": False,
+            })
+        return {"finding_id": str(finding.id), "total_score": finding.total_score, "pending_pages": pending_pages}
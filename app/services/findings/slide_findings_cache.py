@@ -0,0 +1,57 @@
+# app/services/findings/slide_findings_cache.py
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.presentation_model import SlideFindingsCacheEntry
+from app.schemas.findings_schema import SlideFindings
+from app.utils.openai.openai_caller import FINDINGS_PROMPT_VERSION
+
+
+class SlideFindingsCache:
+    """Postgres-backed page hash → findings lookup used by process_presentation_file."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_many(self, keys: list[str]) -> dict[str, list[dict]]:
+        if not keys:
+            return {}
+        rows = (
+            await self.db.execute(
+                select(SlideFindingsCacheEntry.key, SlideFindingsCacheEntry.findings)
+                .where(SlideFindingsCacheEntry.key.in_(set(keys)))
+            )
+        ).all()
+        hits = {key: findings for key, findings in rows}
+        if hits:
+            await self.db.execute(
+                update(SlideFindingsCacheEntry)
+                .where(SlideFindingsCacheEntry.key.in_(hits))
+                .values(last_used_at=datetime.now(timezone.utc))
+            )
+            await self.db.commit()
+        return hits
+
+    async def put_many(self, entries: dict[str, SlideFindings]) -> None:
+        if not entries:
+            return
+        now = datetime.now(timezone.utc)
+        await self.db.execute(
+            insert(SlideFindingsCacheEntry)
+            .values([
+                {
+                    "key": key,
+                    "prompt_version": FINDINGS_PROMPT_VERSION,
+                    "findings": [f.model_dump() for f in slide.findings],
+                    "created_at": now,
+                    "last_used_at": now,
+                }
+                for key, slide in entries.items()
+            ])
+            .on_conflict_do_nothing(index_elements=["key"])
+        )
+        await self.db.commit()
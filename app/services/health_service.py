@@ -1,5 +1,16 @@
+from app.db.database import pool_stats
+from app.services.blendshapes_writer import blendshape_writer
+
+
 def perform_health_check() -> dict:
     return {
         "status": "ok",
         "message": "PitchPilot-BE is up and flying."
     }
+
+
+def get_db_pool_status() -> dict:
+    return {
+        "pool": pool_stats(),
+        "blendshape_writer": blendshape_writer.stats(),
+    }
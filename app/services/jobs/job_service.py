@@ -0,0 +1,174 @@
+# app/services/jobs/job_service.py
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, case, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.job_model import Job
+from app.schemas.job_schema import JobKind, JobStatus
+
+
+class JobService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, kind: JobKind, payload: dict) -> Job:
+        job = Job(
+            kind=kind,
+            status=JobStatus.pending,
+            payload=jsonable_encoder(payload),
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            run_after=datetime.now(timezone.utc),
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get_job(self, job_id: uuid.UUID) -> Optional[Job]:
+        return await self.db.get(Job, job_id)
+
+    async def fail_exhausted_leases(self, kinds: Optional[list[JobKind]] = None) -> list[Job]:
+        """
+        Running jobs whose lease expired and that already used all attempts:
+        the worker died on each of them, so they are failed instead of re-run.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            update(Job)
+            .where(
+                Job.status == JobStatus.running,
+                Job.leased_until < now,
+                Job.attempts >= Job.max_attempts,
+            )
+            .values(
+                status=JobStatus.failed,
+                error="Lease expired on the last attempt (worker stopped while running the job)",
+                leased_until=None,
+                finished_at=now,
+            )
+            .returning(Job)
+        )
+        if kinds:
+            stmt = stmt.where(Job.kind.in_(kinds))
+        jobs = list((await self.db.execute(stmt)).scalars().all())
+        await self.db.commit()
+        return jobs
+
+    async def claim_next(
+        self,
+        kinds: Optional[list[JobKind]] = None,
+        on_exhausted: Optional[Callable[[Job], Awaitable[None]]] = None,
+    ) -> Optional[Job]:
+        """
+        Atomically take the oldest runnable job.
+
+        Pending jobs whose `run_after` has passed are runnable, and so are running
+        jobs whose lease expired (the worker holding them died) while attempts are
+        left; expired jobs without attempts left are failed first and passed to
+        `on_exhausted`. Concurrent workers never block each other thanks to
+        SKIP LOCKED.
+        """
+        for failed in await self.fail_exhausted_leases(kinds):
+            print(f"[JOB] {failed.kind.value} {failed.id} failed: lease expired after {failed.attempts} attempt(s)")
+            if on_exhausted is not None:
+                await on_exhausted(failed)
+
+        now = func.now()
+        stmt = (
+            select(Job)
+            .where(
+                or_(
+                    and_(Job.status == JobStatus.pending, Job.run_after <= now),
+                    and_(
+                        Job.status == JobStatus.running,
+                        Job.leased_until < now,
+                        Job.attempts < Job.max_attempts,
+                    ),
+                )
+            )
+            .order_by(Job.run_after.asc())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if kinds:
+            stmt = stmt.where(Job.kind.in_(kinds))
+
+        job = (await self.db.execute(stmt)).scalar_one_or_none()
+        if job is None:
+            await self.db.rollback()
+            return None
+
+        started = datetime.now(timezone.utc)
+        job.status = JobStatus.running
+        job.attempts += 1
+        job.started_at = started
+        job.leased_until = started + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        job.error = None
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def extend_lease(self, job_id: uuid.UUID, attempt: int) -> bool:
+        """
+        Push `leased_until` out by JOB_LEASE_SECONDS while the attempt is still
+        running; False if the job was reclaimed or finished meanwhile.
+        """
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.running, Job.attempts == attempt)
+            .values(leased_until=datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def mark_done(self, job_id: uuid.UUID, attempt: int, result: Optional[dict]) -> bool:
+        """
+        Store the result of `attempt`; False (and nothing written) if that
+        attempt no longer holds the job because its lease was reclaimed.
+        """
+        outcome = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.running, Job.attempts == attempt)
+            .values(
+                status=JobStatus.done,
+                result=jsonable_encoder(result) if result is not None else None,
+                finished_at=datetime.now(timezone.utc),
+                leased_until=None,
+            )
+        )
+        await self.db.commit()
+        return outcome.rowcount == 1
+
+    async def mark_failed(self, job_id: uuid.UUID, attempt: int, error: str) -> bool:
+        """
+        Record a failed attempt; the job is retried with backoff until
+        max_attempts. Like `mark_done`, a no-op returning False for an attempt
+        that no longer holds the job.
+        """
+        now = datetime.now(timezone.utc)
+        retry = Job.max_attempts > attempt
+        outcome = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.running, Job.attempts == attempt)
+            .values(
+                error=error,
+                leased_until=None,
+                status=case(
+                    (retry, literal(JobStatus.pending, Job.status.type)),
+                    else_=literal(JobStatus.failed, Job.status.type),
+                ),
+                run_after=case(
+                    (retry, now + timedelta(seconds=settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))),
+                    else_=Job.run_after,
+                ),
+                finished_at=case((retry, Job.finished_at), else_=now),
+            )
+        )
+        await self.db.commit()
+        return outcome.rowcount == 1
@@ -0,0 +1,153 @@
+# app/services/llm_cache.py
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.database import async_session
+from app.models.llm_cache_model import LLMCacheEntry
+
+
+def cache_key(kind: str, key_parts: list) -> str:
+    """sha256 over the call type and everything that determines the answer (model, prompt version, schema, input)."""
+    raw = json.dumps([kind, *key_parts], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class LLMResultCache:
+    """
+    Two-level cache for deterministic (temperature=0) LLM calls.
+
+    * level 1: per-process LRU of LLM_CACHE_MEMORY_ENTRIES results
+    * level 2: the `llm_cache` table, shared by all processes
+
+    Entries live LLM_CACHE_TTL_SECONDS. Every LLM_CACHE_PRUNE_SECONDS a store
+    also deletes expired rows and trims the table to the LLM_CACHE_MAX_ROWS
+    most recently used. Postgres errors degrade to a cache miss: the cache
+    must never fail the call it wraps.
+    """
+
+    def __init__(self):
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._last_prune = 0.0
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, kind: str, counter: str) -> None:
+        counters = self._counters.setdefault(kind, {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0})
+        counters[counter] += 1
+
+    def _memory_get(self, key: str):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > settings.LLM_CACHE_MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    async def _db_get(self, key: str):
+        now = datetime.now(timezone.utc)
+        async with async_session() as db:
+            row = (
+                await db.execute(
+                    select(LLMCacheEntry.value, LLMCacheEntry.expires_at)
+                    .where(LLMCacheEntry.key == key, LLMCacheEntry.expires_at > now)
+                )
+            ).one_or_none()
+            if row is None:
+                return None
+            await db.execute(update(LLMCacheEntry).where(LLMCacheEntry.key == key).values(last_used_at=now))
+            await db.commit()
+            return row
+
+    async def _db_put(self, kind: str, key: str, value, expires_at: datetime) -> None:
+        now = datetime.now(timezone.utc)
+        values = {
+            "kind": kind,
+            "value": value,
+            "size_bytes": len(json.dumps(value)),
+            "created_at": now,
+            "expires_at": expires_at,
+            "last_used_at": now,
+        }
+        async with async_session() as db:
+            await db.execute(
+                insert(LLMCacheEntry)
+                .values(key=key, **values)
+                .on_conflict_do_update(index_elements=["key"], set_=values)
+            )
+            if time.monotonic() - self._last_prune >= settings.LLM_CACHE_PRUNE_SECONDS:
+                self._last_prune = time.monotonic()
+                await self._prune(db, now)
+            await db.commit()
+
+    async def _prune(self, db, now: datetime) -> None:
+        expired = await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now))
+        keep = (
+            select(LLMCacheEntry.key)
+            .order_by(LLMCacheEntry.last_used_at.desc())
+            .offset(settings.LLM_CACHE_MAX_ROWS)
+        )
+        evicted = await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(keep)))
+        if expired.rowcount or evicted.rowcount:
+            print(f"[LLM-CACHE] pruned {expired.rowcount} expired and {evicted.rowcount} least recently used rows")
+
+    async def get_or_call(self, kind: str, key_parts: list, call: Callable[[], Awaitable[Any]]):
+        """
+        Cached result for `key_parts`, else `await call()` and store its
+        (JSON-serialisable) result. Exceptions of `call` are not cached.
+        """
+        if not settings.LLM_CACHE_ENABLED:
+            return await call()
+        key = cache_key(kind, key_parts)
+
+        value = self._memory_get(key)
+        if value is not None:
+            self._count(kind, "memory_hits")
+            return value
+        try:
+            row = await self._db_get(key)
+        except Exception as e:
+            print(f"[LLM-CACHE] lookup failed, calling the LLM: {e}")
+            row = None
+        if row is not None:
+            self._count(kind, "db_hits")
+            value, expires_at = row
+            self._memory_put(key, value, expires_at.timestamp())
+            return value
+
+        self._count(kind, "misses")
+        value = await call()
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+        self._memory_put(key, value, expires_at.timestamp())
+        try:
+            await self._db_put(kind, key, value, expires_at)
+            self._count(kind, "stores")
+        except Exception as e:
+            print(f"[LLM-CACHE] store failed: {e}")
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_limit": settings.LLM_CACHE_MEMORY_ENTRIES,
+            "kinds": {kind: dict(counters) for kind, counters in sorted(self._counters.items())},
+        }
+
+
+llm_result_cache = LLMResultCache()
@@ -1,6 +1,8 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.presentation_model import Presentation
+from app.schemas.presentation_schema import ProcessingStatus
 
 class PresentationService:
     def __init__(self, db: AsyncSession):
@@ -13,8 +15,20 @@ class PresentationService:
             description=data["description"],
             tags=data["tags"],
             file_url=data["file_url"],
+            findings_status=data.get("findings_status"),
         )
         self.db.add(presentation)
         await self.db.commit()
         await self.db.refresh(presentation)
-        return presentation
\ No newline at end of file
+        return presentation
+
+    async def set_findings_status(
+        self, presentation_id, status: ProcessingStatus, error: Optional[str] = None
+    ) -> Presentation:
+        presentation: Presentation | None = await self.db.get(Presentation, presentation_id)
+        if presentation is None:
+            raise LookupError("Presentation not found")
+        presentation.findings_status = status
+        presentation.findings_error = error
+        await self.db.commit()
+        return presentation
@@ -0,0 +1,162 @@
+# app/services/recordings/recording_service.py
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.presentation_model import PresentationFinding, Training, TrainingResult
+from app.services.blendshapes_service import BlendshapeService
+from app.services.llm_cache import llm_result_cache
+from app.services.training.training_service import TrainingService
+from app.utils.audio.audio_analysis_helper import analyse_local_file
+from app.utils.eye_tracking.heatmap_codec import legacy_heatmap
+from app.utils.slides.slide_analytics import SlideTimeline, compute_slide_analytics
+from app.utils.training_score import combine_total_score
+from app.utils.minio_helper import compose_to_single, download_object_to_tmpfile, public_object_url
+
+
+class RecordingService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def finish_recording(
+        self,
+        training_id: str,
+        prefix: str,
+        slide_events: Optional[List[dict]] = None,
+    ) -> dict:
+        """
+        Compose the uploaded parts, analyse audio and eye tracking and store the
+        TrainingResult. Runs inside a job worker, never inside an HTTP request.
+        Blocking steps are pushed to threads so one worker can run several jobs.
+        """
+        final_key = f"{training_id}/{prefix.split('/')[-1]}.webm"
+        await asyncio.to_thread(compose_to_single, prefix, final_key)
+        video_url = public_object_url(final_key)
+
+        training = await self.db.get(Training, training_id)
+        if training is None:
+            raise LookupError("Training not found")
+        if slide_events:
+            training.slide_events = slide_events
+        training_service = TrainingService(self.db)
+        await training_service.set_video_url(training.id, video_url)
+        tmp_path = await asyncio.to_thread(download_object_to_tmpfile, final_key)
+        try:
+            audio_analysis = await analyse_local_file(tmp_path, llm_cache=llm_result_cache)
+        finally:
+            os.remove(tmp_path)
+        eye_tracking_results = None
+        heatmap, attention_score = await BlendshapeService(self.db).get_eye_tracking_result(training_id)
+        if heatmap:
+            eye_tracking_results = {"scores": legacy_heatmap(heatmap), "total_score": attention_score}
+        slide_scores = await self.get_slide_scores(training_id, training.slide_events, audio_analysis)
+        stmt = select(TrainingResult).where(TrainingResult.training_id == training_id)
+        existing_result = await self.db.execute(stmt)
+        existing_result = existing_result.scalar_one_or_none()
+
+        if existing_result:
+            existing_result.audio_scores = audio_analysis
+            existing_result.audio_total_score = audio_analysis["total_score"]
+            if heatmap is not None:
+                existing_result.eye_tracking_scores = heatmap
+                existing_result.eye_tracking_total_score = attention_score
+            existing_result.slide_scores = slide_scores
+            existing_result.created_at = datetime.now(timezone.utc)
+            result = existing_result
+        else:
+            result = TrainingResult(
+                training_id=training_id,
+                audio_scores=audio_analysis,
+                audio_total_score=audio_analysis["total_score"],
+                eye_tracking_scores=heatmap,
+                eye_tracking_total_score=attention_score,
+                slide_scores=slide_scores,
+                created_at=datetime.now(timezone.utc)
+            )
+            self.db.add(result)
+            await self.db.flush()
+
+        await self.db.commit()
+        await self.db.refresh(result)
+
+        presentation_id = training.presentation_id
+
+        finding = (
+            await self.db.execute(
+                select(PresentationFinding)
+                .where(
+                    PresentationFinding.presentation_id == presentation_id,
+                    PresentationFinding.is_active == True
+                )
+                .order_by(desc(PresentationFinding.created_at))
+                .limit(1)
+            )
+        ).scalars().first()
+
+        if not finding:
+            finding = (
+                await self.db.execute(
+                    select(PresentationFinding)
+                    .where(PresentationFinding.presentation_id == presentation_id)
+                    .order_by(desc(PresentationFinding.created_at))
+                    .limit(1)
+                )
+            ).scalars().first()
+
+        content_score = finding.total_score if finding else 0.0
+
+        # 2. Calculate total score
+        total_score = combine_total_score(
+            attention_score,
+            audio_analysis["total_score"] if audio_analysis and "total_score" in audio_analysis else None,
+            content_score,
+        )
+
+        # 3. Save to training
+        training.total_score = total_score
+        await self.db.commit()
+
+        return {
+            "object": final_key,
+            "url": video_url,
+            "total_score": total_score,
+            "analysis": {
+                "audio": audio_analysis,
+                "eye_tracking": eye_tracking_results
+            },
+            "result_id": str(result.id)
+        }
+
+    async def get_slide_scores(
+        self,
+        training_id: str,
+        slide_events: Optional[List[dict]],
+        audio_analysis: dict,
+    ) -> Optional[List[dict]]:
+        """
+        Per-slide breakdown, or None when the training has no slide events.
+        Frames are streamed chunk by chunk from the first slide event on.
+        """
+        if not slide_events:
+            return None
+        timeline = SlideTimeline(slide_events)
+        service = BlendshapeService(self.db)
+        async for timestamps, matrix in service.iter_blendshape_chunks(training_id, from_ts=timeline.start):
+            timeline.add_frames(timestamps, matrix)
+        if not timeline.frame_count.any() and await service.count_frames(training_id):
+            print(
+                f"[SLIDES] Training {training_id}: no blendshape frame falls into a slide interval, "
+                "slide event timestamps are probably not on the frame clock"
+            )
+        return await asyncio.to_thread(
+            compute_slide_analytics,
+            timeline,
+            audio_analysis["transcript"]["words"],
+            audio_analysis["volume_timeline"],
+            audio_analysis.get("duration"),
+        )
@@ -30,6 +30,10 @@ class TrainingService:
         await self.db.refresh(instance)
         return instance
 
+    async def training_exists(self, training_id: UUID) -> bool:
+        found = await self.db.scalar(select(Training.id).where(Training.id == training_id))
+        return found is not None
+
     async def set_score(self, training_id: UUID, score: float) -> Training:
         training: Training | None = await self.db.get(Training, training_id)
         if training is None:
@@ -1,9 +1,8 @@
+import asyncio
 import json
-import os
 import pathlib
 import math
 import numpy as np
-import soundfile as sf
 from typing import TypedDict
 from faster_whisper import WhisperModel
 from app.core.config import settings
@@ -11,13 +10,13 @@ from ctranslate2 import get_cuda_device_count
 import ffmpeg
 from app.utils.openai.openai_caller import get_audio_feedback_from_llm
 from app.utils.audio.audio_score_calculator import (
+    audio_scores_from_metrics,
     read_env_score_config,
-    speaking_pace_score,
-    volume_score,
-    filler_ratio_score,
-    total_score,
 )
-from concurrent.futures import ThreadPoolExecutor
+
+SAMPLE_RATE = 16000  # what Whisper expects; every audio metric works on this rate
+VOLUME_WINDOW_SECONDS = 0.1
+VOLUME_BLOCK_SECONDS = 60
 
 _whisper_model = None
 
@@ -49,10 +48,23 @@ class Analysis(TypedDict):
     volume_score: float
     total_score: float
 
-def extract_transcript_and_words(path: str | pathlib.Path):
+def decode_audio(path: str | pathlib.Path, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode a recording once into a mono float32 PCM buffer at `sample_rate`.
+    ffmpeg writes raw samples to stdout, so nothing touches the disk; every
+    analysis step below shares the returned array.
+    """
+    out, _ = (
+        ffmpeg.input(str(path))
+        .output("pipe:", format="f32le", acodec="pcm_f32le", ac=1, ar=sample_rate)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, dtype=np.float32)
+
+def extract_transcript_and_words(audio: np.ndarray):
     model = get_whisper_model()
     segments, info = model.transcribe(
-        str(path), beam_size=1, vad_filter=True, word_timestamps=True
+        audio, beam_size=1, vad_filter=True, word_timestamps=True
     )
     transcript_words = []
     transcript_full_text = []
@@ -72,62 +84,84 @@ def extract_transcript_and_words(path: str | pathlib.Path):
     transcript_text = " ".join(transcript_full_text)
     return transcript_text, transcript_words, duration, wpm
 
-def extract_audio_volume(path: str | pathlib.Path):
-    pcm_path = pathlib.Path(path).with_suffix(".wav")
+def iter_pcm_blocks(audio: np.ndarray, block_size: int):
+    """Yield consecutive views of at most `block_size` samples (no copies)."""
+    for start in range(0, len(audio), block_size):
+        yield start, audio[start:start + block_size]
+
+def extract_audio_volume(audio: np.ndarray, sr: int = SAMPLE_RATE):
+    """
+    Average dBFS plus a 100 ms RMS/dBFS timeline.
+
+    Works block by block with reshaped NumPy reductions, so temporaries stay at
+    VOLUME_BLOCK_SECONDS of float32 no matter how long the recording is.
+    """
     try:
-        (
-            ffmpeg.input(str(path))
-            .output(str(pcm_path), ac=1, ar=16000, format="wav")
-            .overwrite_output()
-            .run(quiet=True)
-        )
-        audio, sr = sf.read(pcm_path)
-        rms = float(np.sqrt(np.mean(audio ** 2)))
+        samples_per_chunk = int(sr * VOLUME_WINDOW_SECONDS)
+        block_size = samples_per_chunk * max(1, int(VOLUME_BLOCK_SECONDS / VOLUME_WINDOW_SECONDS))
+
+        total_energy = 0.0
+        starts, rms_blocks = [], []
+        for offset, block in iter_pcm_blocks(audio, block_size):
+            squared = np.square(block)
+            total_energy += float(squared.sum(dtype=np.float64))
+
+            full = len(block) // samples_per_chunk * samples_per_chunk
+            means = squared[:full].reshape(-1, samples_per_chunk).mean(axis=1, dtype=np.float64)
+            if full < len(block):  # trailing partial window, only in the last block
+                means = np.append(means, squared[full:].mean(dtype=np.float64))
+            rms_blocks.append(np.sqrt(means))
+            starts.append(offset + np.arange(len(means)) * samples_per_chunk)
+
+        if not rms_blocks:
+            return -99.0, []
+
+        rms = float(np.sqrt(total_energy / len(audio)))
         avg_dbfs = 20 * math.log10(rms) if rms > 0 else float("-inf")
 
-        chunk_duration = 0.1
-        samples_per_chunk = int(sr * chunk_duration)
-        volume_timeline = []
-        for i in range(0, len(audio), samples_per_chunk):
-            chunk = audio[i:i + samples_per_chunk]
-            chunk_rms = np.sqrt(np.mean(chunk ** 2)) if len(chunk) else 0
-            chunk_dbfs = 20 * math.log10(chunk_rms) if chunk_rms > 0 else -100
-            volume_timeline.append({
-                "t": round(i / sr, 2),
-                "rms": round(float(chunk_rms), 6),
-                "dbfs": round(chunk_dbfs, 1),
-            })
-        os.remove(pcm_path)
+        chunk_rms = np.concatenate(rms_blocks)
+        with np.errstate(divide="ignore"):
+            chunk_dbfs = np.where(chunk_rms > 0, 20 * np.log10(chunk_rms), -100.0)
+        times = np.concatenate(starts) / sr
+
+        volume_timeline = [
+            {"t": t, "rms": r, "dbfs": d}
+            for t, r, d in zip(
+                np.round(times, 2).tolist(),
+                np.round(chunk_rms, 6).tolist(),
+                np.round(chunk_dbfs, 1).tolist(),
+            )
+        ]
         return avg_dbfs, volume_timeline
     except Exception as e:
-        print(f"Error processing audio file {path}: {type(e)} - {e}")
+        print(f"Error processing audio buffer: {type(e)} - {e}")
         import traceback
         traceback.print_exc()
         return -99.0, []
 
-def analyse_local_file(path: str | pathlib.Path) -> Analysis:
-    with ThreadPoolExecutor() as executor:
-        futures = {
-            "transcript": executor.submit(extract_transcript_and_words, path),
-            "volume": executor.submit(extract_audio_volume, path),
-        }
-        results = {key: future.result() for key, future in futures.items()}
-
-    transcript_text, transcript_words, duration, wpm = results["transcript"]
-    avg_dbfs, volume_timeline = results["volume"]
-    feedback = get_audio_feedback_from_llm(transcript_text)
+async def analyse_local_file(path: str | pathlib.Path, llm_cache=None) -> Analysis:
+    """
+    Decode once, transcribe and measure volume in threads, then await the LLM
+    feedback (through `llm_cache`, if given, so an identical transcript is
+    only sent once).
+    """
+    audio = await asyncio.to_thread(decode_audio, path)
+    (transcript_text, transcript_words, duration, wpm), (avg_dbfs, volume_timeline) = await asyncio.gather(
+        asyncio.to_thread(extract_transcript_and_words, audio),
+        asyncio.to_thread(extract_audio_volume, audio),
+    )
+    feedback = await get_audio_feedback_from_llm(transcript_text, llm_cache)
 
     clarity = feedback.get("clarity_score", 0)
     engagement = feedback.get("engagement_rating", 0)
 
-    cfg = read_env_score_config()
-    speaking = speaking_pace_score(wpm, cfg)
-    volume = volume_score(avg_dbfs, cfg)
     filler_count = sum(f["count"] for f in feedback["fillers"])
     filler_ratio_val = filler_count / len(transcript_words) if transcript_words else 0
-    filler_score_val = filler_ratio_score(filler_ratio_val, cfg)
 
-    total = total_score(clarity, engagement, speaking, volume, filler_score_val, cfg)
+    scores = audio_scores_from_metrics(wpm, avg_dbfs, filler_ratio_val, clarity, engagement, read_env_score_config())
+    speaking, volume = scores["speaking_score"], scores["volume_score"]
+    filler_score_val = scores["filler_score"]
+    total = scores["total_score"]
 
     return {
         "transcript": {
@@ -1,3 +1,5 @@
+import numpy as np
+
 from app.core.config import settings
 
 def read_env_score_config():
@@ -16,42 +18,58 @@ def read_env_score_config():
         }
     }
 
-def speaking_pace_score(wpm: float, config: dict) -> int:
-    ideal = config["ideal_wpm"]
-    deviation = config["max_wpm_deviation"]
-    diff = abs(wpm - ideal)
-    if diff >= deviation:
-        return 0
-    return round((1 - (diff / deviation)) * 100)
-
-def volume_score(avg_dbfs: float, config: dict) -> int:
-    ideal = config["ideal_dbfs"]
-    margin = config["dbfs_margin"]
-    diff = abs(avg_dbfs - ideal)
-    if diff >= margin:
-        return 0
-    return round((1 - (diff / margin)) * 100)
-
-def filler_ratio_score(ratio: float, config: dict) -> int:
+# All score functions accept scalars or NumPy arrays. Scalars come back as int
+# like before; arrays come back as float arrays so NaN (missing metric) survives.
+
+def _rounded(value):
+    value = np.round(value)
+    return int(value) if np.ndim(value) == 0 else value
+
+def _linear_score(value, ideal, margin):
+    diff = np.abs(np.asarray(value, dtype=np.float64) - ideal)
+    return _rounded(np.where(diff >= margin, 0.0, (1 - (diff / margin)) * 100))
+
+def speaking_pace_score(wpm, config: dict):
+    return _linear_score(wpm, config["ideal_wpm"], config["max_wpm_deviation"])
+
+def volume_score(avg_dbfs, config: dict):
+    return _linear_score(avg_dbfs, config["ideal_dbfs"], config["dbfs_margin"])
+
+def filler_ratio_score(ratio, config: dict):
     threshold = config["filler_threshold"]
-    if ratio >= threshold:
-        return 0
-    return round((1 - (ratio / threshold)) * 100)
+    ratio = np.asarray(ratio, dtype=np.float64)
+    return _rounded(np.where(ratio >= threshold, 0.0, (1 - (ratio / threshold)) * 100))
 
 def total_score(
-    speaking_score: int,
-    volume_score_: int,
-    filler_score: int,
-    clarity_score: int,
-    engagement_rating: int,
+    speaking_score,
+    volume_score_,
+    filler_score,
+    clarity_score,
+    engagement_rating,
     config: dict
-) -> int:
+):
     w = config["weights"]
     weighted_sum = (
-        speaking_score * w["speaking"] +
-        volume_score_ * w["volume"] +
-        filler_score * w["filler"] +
-        clarity_score * w["clarity"] +
-        engagement_rating * w["engagement"]
+        np.asarray(speaking_score, dtype=np.float64) * w["speaking"] +
+        np.asarray(volume_score_, dtype=np.float64) * w["volume"] +
+        np.asarray(filler_score, dtype=np.float64) * w["filler"] +
+        np.asarray(clarity_score, dtype=np.float64) * w["clarity"] +
+        np.asarray(engagement_rating, dtype=np.float64) * w["engagement"]
     )
-    return round(weighted_sum)
+    return _rounded(weighted_sum)
+
+def audio_scores_from_metrics(wpm, avg_dbfs, filler_ratio, clarity, engagement, config: dict) -> dict:
+    """
+    Sub-scores and total from the stored audio metrics. Shared by the finish
+    pipeline and the re-score command, so both weigh metrics identically
+    (including the argument order `total_score` has always been called with).
+    """
+    speaking = speaking_pace_score(wpm, config)
+    volume = volume_score(avg_dbfs, config)
+    filler = filler_ratio_score(filler_ratio, config)
+    return {
+        "speaking_score": speaking,
+        "volume_score": volume,
+        "filler_score": filler,
+        "total_score": total_score(clarity, engagement, speaking, volume, filler, config),
+    }
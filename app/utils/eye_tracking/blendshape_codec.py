@@ -0,0 +1,98 @@
+"""
+Packed storage format for blendshape frames.
+
+A chunk holds `n` frames as two little-endian byte strings:
+    timestamps  n × float64   seconds since training start
+    scores      n × k float32 row-major, column order given by the schema version
+Schemas are append-only: a stored chunk is always decoded with the category
+order it was written with and re-mapped onto the current one.
+"""
+
+import numpy as np
+
+from app.utils.eye_tracking.blendshape_categories import BLENDSHAPE_CATEGORIES
+
+BLENDSHAPE_SCHEMA_VERSION = 1
+
+BLENDSHAPE_SCHEMAS: dict[int, tuple[str, ...]] = {
+    1: BLENDSHAPE_CATEGORIES,
+}
+
+_TS_DTYPE = np.dtype("<f8")
+_SCORE_DTYPE = np.dtype("<f4")
+
+
+def pack_frames(timestamps: np.ndarray, matrix: np.ndarray) -> tuple[bytes, bytes]:
+    """Serialize frames written in the current schema."""
+    if matrix.shape != (len(timestamps), len(BLENDSHAPE_SCHEMAS[BLENDSHAPE_SCHEMA_VERSION])):
+        raise ValueError(f"matrix shape {matrix.shape} does not match {len(timestamps)} frames")
+    return (
+        np.ascontiguousarray(timestamps, dtype=_TS_DTYPE).tobytes(),
+        np.ascontiguousarray(matrix, dtype=_SCORE_DTYPE).tobytes(),
+    )
+
+
+def unpack_frames(timestamps: bytes, scores: bytes, schema_version: int) -> tuple[np.ndarray, np.ndarray]:
+    """Deserialize a chunk into (timestamps, matrix) in the current schema."""
+    categories = BLENDSHAPE_SCHEMAS.get(schema_version)
+    if categories is None:
+        raise ValueError(f"Unknown blendshape schema version {schema_version}")
+
+    ts = np.frombuffer(timestamps, dtype=_TS_DTYPE)
+    matrix = np.frombuffer(scores, dtype=_SCORE_DTYPE).reshape(len(ts), len(categories))
+    if schema_version == BLENDSHAPE_SCHEMA_VERSION:
+        return ts, matrix
+
+    current = BLENDSHAPE_SCHEMAS[BLENDSHAPE_SCHEMA_VERSION]
+    source_index = {name: i for i, name in enumerate(categories)}
+    remapped = np.zeros((len(ts), len(current)), dtype=np.float32)
+    for j, name in enumerate(current):
+        i = source_index.get(name)
+        if i is not None:
+            remapped[:, j] = matrix[:, i]
+    return ts, remapped
+
+
+def matrix_to_score_lists(matrix: np.ndarray) -> list[list[dict]]:
+    """Expand frames back into MediaPipe's `{index, score, categoryName, displayName}` lists."""
+    categories = BLENDSHAPE_SCHEMAS[BLENDSHAPE_SCHEMA_VERSION]
+    return [
+        [
+            {"index": j, "score": score, "categoryName": name, "displayName": ""}
+            for j, (name, score) in enumerate(zip(categories, row))
+        ]
+        for row in matrix.tolist()
+    ]
+
+
+# ───────────────────────────────────────────────
+# WebSocket wire format
+# ───────────────────────────────────────────────
+WS_BINARY_PROTOCOL = "pp-blendshapes-bin-1"
+
+
+def frame_dtype(n_categories: int) -> np.dtype:
+    """One wire frame: float64 timestamp followed by the scores as float32, little-endian."""
+    return np.dtype([("t", "<f8"), ("s", "<f4", (n_categories,))])
+
+
+def build_category_mapping(client_categories: list[str]) -> np.ndarray:
+    """
+    For each current-schema column the index into the client's vector, or -1
+    if the client does not send that category.
+    """
+    position = {name: i for i, name in enumerate(client_categories)}
+    current = BLENDSHAPE_SCHEMAS[BLENDSHAPE_SCHEMA_VERSION]
+    return np.array([position.get(name, -1) for name in current], dtype=np.intp)
+
+
+def decode_binary_frames(data: bytes, dtype: np.dtype, mapping: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Decode one binary message (any number of packed frames) into (timestamps, matrix)."""
+    if len(data) % dtype.itemsize:
+        raise ValueError(f"message of {len(data)} bytes is not a multiple of {dtype.itemsize}")
+    frames = np.frombuffer(data, dtype=dtype)
+    client_scores = frames["s"]
+    matrix = np.zeros((len(frames), len(mapping)), dtype=np.float32)
+    known = mapping >= 0
+    matrix[:, known] = client_scores[:, mapping[known]]
+    return frames["t"].astype(np.float64), matrix
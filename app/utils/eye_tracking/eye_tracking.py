@@ -1,133 +1,228 @@
 import json
-import math
+import numpy as np
 
-def blendshape_array_to_dict(blendshape_arr):
-    """
-    Wandelt ein Array von Blendshape-Objekten in ein Dict mit Blickrichtungsschlüsseln um.
-    """
-    def get_score(name):
-        for b in blendshape_arr:
-            if b.get("categoryName") == name:
-                return b.get("score", 0.0)
-        return 0.0
-
-    result = {
-        "eyeLookUpLeft": get_score("eyeLookUpLeft"),
-        "eyeLookUpRight": get_score("eyeLookUpRight"),
-        "eyeLookDownLeft": get_score("eyeLookDownLeft"),
-        "eyeLookDownRight": get_score("eyeLookDownRight"),
-        "eyeLookInLeft": get_score("eyeLookInLeft"),
-        "eyeLookInRight": get_score("eyeLookInRight"),
-        "eyeLookOutLeft": get_score("eyeLookOutLeft"),
-        "eyeLookOutRight": get_score("eyeLookOutRight"),
-        "eyeSquintLeft": get_score("eyeSquintLeft"),
-        "eyeSquintRight": get_score("eyeSquintRight"),
-        "mouthSmileLeft": get_score("mouthSmileLeft"),
-        "mouthSmileRight": get_score("mouthSmileRight"),
-        "browInnerUp": get_score("browInnerUp"),
-        "mouthFrownLeft": get_score("mouthFrownLeft"),
-        "mouthFrownRight": get_score("mouthFrownRight"),
-        "browDownLeft": get_score("browDownLeft"),
-        "browDownRight": get_score("browDownRight"),
-        "jawOpen": get_score("jawOpen"),
-    }
-    result["eyeLookUp"] = (result["eyeLookUpLeft"] + result["eyeLookUpRight"]) / 2
-    result["eyeLookDown"] = (result["eyeLookDownLeft"] + result["eyeLookDownRight"]) / 2
-    result["eyeLookLeft"] = (result["eyeLookOutLeft"] + result["eyeLookInRight"]) / 2
-    result["eyeLookRight"] = (result["eyeLookInLeft"] + result["eyeLookOutRight"]) / 2
-    return result
-
-def parse_blendshape_entry(entry):
+from app.utils.eye_tracking.blendshape_categories import BLENDSHAPE_CATEGORIES, CATEGORY_INDEX
+from app.utils.eye_tracking.heatmap_codec import encode_heatmap
+
+_C = CATEGORY_INDEX
+
+
+def _scores_to_row(entry, row: np.ndarray) -> bool:
     """
-    Wandelt einen Frame (`scores`-Liste) in ein verarbeitbares Dictionary um.
+    Schreibt einen Frame (`scores`-Liste, JSON-String oder Dict) in eine Matrixzeile.
+    Gibt False zurück, wenn der Frame nicht lesbar ist.
     """
-    if isinstance(entry, list):
-        return blendshape_array_to_dict(entry)    
-    elif isinstance(entry, str):
+    if isinstance(entry, str):
         try:
-            return blendshape_array_to_dict(json.loads(entry))
+            entry = json.loads(entry)
         except Exception:
-            return {}
-    elif isinstance(entry, dict):
-        return entry
-    return {}
+            return False
+    if isinstance(entry, list):
+        if (
+            len(entry) == len(BLENDSHAPE_CATEGORIES)
+            and entry[0].get("categoryName") == BLENDSHAPE_CATEGORIES[0]
+            and entry[-1].get("categoryName") == BLENDSHAPE_CATEGORIES[-1]
+        ):
+            # Vollständiger MediaPipe-Frame in Standardreihenfolge: kein Lookup nötig
+            row[:] = [b.get("score", 0.0) for b in entry]
+            return True
+        for b in entry:
+            j = _C.get(b.get("categoryName"))
+            if j is not None:
+                row[j] = b.get("score", 0.0)
+        return True
+    if isinstance(entry, dict):
+        for name, score in entry.items():
+            j = _C.get(name)
+            if j is not None:
+                row[j] = score
+        return bool(entry)
+    return False
 
 
-def calculate_eye_tracking(blendshapes: list, grid_size: int = 40) -> tuple[dict, float]:
+def load_blendshape_matrix(blendshapes: list) -> tuple[np.ndarray, np.ndarray]:
     """
-    Berechnet EINE 2D-Heatmap der Blickrichtung.
-    Gibt nur noch die Heatmap und einen Dummy-Score von 0.0 zurück, 
-    da der echte Score jetzt von calculate_attention_score berechnet wird.
+    Lädt alle Frames eines Trainings in EINEM Durchlauf spaltenweise.
+    Gibt (timestamps, matrix) zurück; matrix hat die Form (n_frames × 52), float32,
+    Spalte i entspricht BLENDSHAPE_CATEGORIES[i]. Leere Frames werden übersprungen.
     """
-    processed_frames = []
+    matrix = np.zeros((len(blendshapes), len(BLENDSHAPE_CATEGORIES)), dtype=np.float32)
+    timestamps = np.zeros(len(blendshapes), dtype=np.float64)
+    n = 0
     for frame in blendshapes:
-        scores_list = frame.get("scores")
-        if not scores_list:
+        scores = frame.get("scores")
+        if not scores:
             continue
-        d = parse_blendshape_entry(scores_list)
-        if d:
-            processed_frames.append(d)
+        if _scores_to_row(scores, matrix[n]):
+            timestamps[n] = frame.get("timestamp", 0.0)
+            n += 1
+        else:
+            matrix[n] = 0.0
+    return timestamps[:n], matrix[:n]
 
-    if not processed_frames:
-        return {}, 0.0
 
-    heatmap = {}
-    for b in processed_frames:
-        x_gaze = b.get("eyeLookRight", 0) - b.get("eyeLookLeft", 0)
-        y_gaze = b.get("eyeLookUp", 0) - b.get("eyeLookDown", 0)
+def gaze_vectors(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Horizontale und vertikale Blickabweichung pro Frame, jeweils in [-1, 1]."""
+    look_up = (matrix[:, _C["eyeLookUpLeft"]] + matrix[:, _C["eyeLookUpRight"]]) / 2
+    look_down = (matrix[:, _C["eyeLookDownLeft"]] + matrix[:, _C["eyeLookDownRight"]]) / 2
+    look_left = (matrix[:, _C["eyeLookOutLeft"]] + matrix[:, _C["eyeLookInRight"]]) / 2
+    look_right = (matrix[:, _C["eyeLookInLeft"]] + matrix[:, _C["eyeLookOutRight"]]) / 2
+    return look_right - look_left, look_up - look_down
 
-        x_norm = (x_gaze + 1) / 2
-        y_norm = (y_gaze + 1) / 2
 
-        gx = min(grid_size - 1, max(0, int(x_norm * (grid_size - 1))))
-        gy = min(grid_size - 1, max(0, int(y_norm * (grid_size - 1))))
+def heatmap_cells(x_gaze: np.ndarray, y_gaze: np.ndarray, grid_size: int = 40) -> np.ndarray:
+    """Flacher Zellindex gx * grid_size + gy pro Frame."""
+    gx = np.clip(np.trunc((x_gaze + 1) / 2 * (grid_size - 1)), 0, grid_size - 1).astype(np.intp)
+    gy = np.clip(np.trunc((y_gaze + 1) / 2 * (grid_size - 1)), 0, grid_size - 1).astype(np.intp)
+    return gx * grid_size + gy
 
-        key = f"{gx},{gy}"
-        heatmap[key] = heatmap.get(key, 0) + 1
-    return heatmap, 0.0
 
+def heatmap_counts(x_gaze: np.ndarray, y_gaze: np.ndarray, grid_size: int = 40) -> np.ndarray:
+    """Zählt die Frames pro Gitterzelle; Ergebnis hat die Form (grid_size × grid_size), Index [gx, gy]."""
+    counts = np.bincount(heatmap_cells(x_gaze, y_gaze, grid_size), minlength=grid_size * grid_size)
+    return counts.reshape(grid_size, grid_size)
 
 
-def calculate_attention_score(blendshapes: list) -> float:
+def attention_frame_scores(matrix: np.ndarray) -> np.ndarray:
     """
-    Berechnet einen fortgeschrittenen, mehrdimensionalen Aufmerksamkeitsscore.
-    Der Score kombiniert drei Faktoren für jeden Frame:
+    Aufmerksamkeitsscore pro Frame aus drei Faktoren:
     1. Gaze Focus: Blickrichtung (zentriert ist besser).
     2. Positive Engagement: Anzeichen für Interesse (Lächeln, Konzentration).
     3. Negative Engagement: Anzeichen für Ablenkung (Stirnrunzeln, Verwirrung).
-    
-    Der finale Score ist der Durchschnitt über alle Frames.
     """
-    processed_frames = []
-    for frame in blendshapes:
-        scores_list = frame.get("scores")
-        if not scores_list:
-            continue
-        parsed_data = parse_blendshape_entry(scores_list)
-        if parsed_data:
-            processed_frames.append(parsed_data)
-
-    if not processed_frames:
-        return 0.0
-
-    frame_scores = []
-    for b in processed_frames:
-        x_gaze = b.get("eyeLookRight", 0) - b.get("eyeLookLeft", 0)
-        y_gaze = b.get("eyeLookUp", 0) - b.get("eyeLookDown", 0)
-        magnitude = math.sqrt(x_gaze**2 + y_gaze**2)
-        normalized_magnitude = min(1.0, magnitude / 1.414)
-        gaze_focus_score = 1.0 - normalized_magnitude
-        smile = (b.get("mouthSmileLeft", 0) + b.get("mouthSmileRight", 0)) / 2
-        brow_up = b.get("browInnerUp", 0)
-        eye_squint = (b.get("eyeSquintLeft", 0) + b.get("eyeSquintRight", 0)) / 2
-        positive_score = (0.5 * smile) + (0.25 * brow_up) + (0.25 * eye_squint)
-        positive_score = min(1.0, positive_score)
-        frown = (b.get("mouthFrownLeft", 0) + b.get("mouthFrownRight", 0)) / 2
-        brow_down = (b.get("browDownLeft", 0) + b.get("browDownRight", 0)) / 2
-        jaw_open = b.get("jawOpen", 0)
-        negative_score = (0.5 * frown) + (0.3 * brow_down) + (0.2 * jaw_open)
-        negative_score = min(1.0, negative_score)
-        final_score = (0.6 * gaze_focus_score + 0.4 * positive_score) * (1.0 - negative_score)
-        frame_scores.append(final_score)
-    total_attention_score = sum(frame_scores) / len(frame_scores) if frame_scores else 0.0
-    return total_attention_score
\ No newline at end of file
+    x_gaze, y_gaze = gaze_vectors(matrix)
+    magnitude = np.sqrt(x_gaze ** 2 + y_gaze ** 2)
+    gaze_focus_score = 1.0 - np.minimum(1.0, magnitude / 1.414)
+
+    smile = (matrix[:, _C["mouthSmileLeft"]] + matrix[:, _C["mouthSmileRight"]]) / 2
+    brow_up = matrix[:, _C["browInnerUp"]]
+    eye_squint = (matrix[:, _C["eyeSquintLeft"]] + matrix[:, _C["eyeSquintRight"]]) / 2
+    positive_score = np.minimum(1.0, 0.5 * smile + 0.25 * brow_up + 0.25 * eye_squint)
+
+    frown = (matrix[:, _C["mouthFrownLeft"]] + matrix[:, _C["mouthFrownRight"]]) / 2
+    brow_down = (matrix[:, _C["browDownLeft"]] + matrix[:, _C["browDownRight"]]) / 2
+    jaw_open = matrix[:, _C["jawOpen"]]
+    negative_score = np.minimum(1.0, 0.5 * frown + 0.3 * brow_down + 0.2 * jaw_open)
+
+    return (0.6 * gaze_focus_score + 0.4 * positive_score) * (1.0 - negative_score)
+
+
+class EyeTrackingAccumulator:
+    """
+    Laufende Summen für Heatmap und Aufmerksamkeitsscore.
+    Wird beim Ingest mit jedem Chunk aktualisiert, sodass das Ergebnis am Ende
+    nicht mehr aus allen Frames neu berechnet werden muss.
+    """
+
+    def __init__(self, grid_size: int = 40):
+        self.grid_size = grid_size
+        self.heatmap = np.zeros((grid_size, grid_size), dtype=np.uint32)
+        self.attention_sum = 0.0
+        self.frame_count = 0
+
+    def update(self, matrix: np.ndarray) -> None:
+        if not len(matrix):
+            return
+        x_gaze, y_gaze = gaze_vectors(matrix)
+        self.heatmap += heatmap_counts(x_gaze, y_gaze, self.grid_size).astype(np.uint32)
+        self.attention_sum += float(attention_frame_scores(matrix).sum(dtype=np.float64))
+        self.frame_count += len(matrix)
+
+    def merge(self, other: "EyeTrackingAccumulator") -> None:
+        if other.grid_size != self.grid_size:
+            raise ValueError("cannot merge heatmaps of different grid sizes")
+        self.heatmap += other.heatmap
+        self.attention_sum += other.attention_sum
+        self.frame_count += other.frame_count
+
+    def packed_heatmap(self) -> bytes:
+        return self.heatmap.astype("<u4").tobytes()
+
+    @classmethod
+    def from_packed(cls, grid_size: int, heatmap: bytes, attention_sum: float, frame_count: int) -> "EyeTrackingAccumulator":
+        acc = cls(grid_size)
+        acc.heatmap = np.frombuffer(heatmap, dtype="<u4").reshape(grid_size, grid_size).astype(np.uint32)
+        acc.attention_sum = attention_sum
+        acc.frame_count = frame_count
+        return acc
+
+    def attention_score(self) -> float:
+        return self.attention_sum / self.frame_count if self.frame_count else 0.0
+
+    def result(self) -> tuple[dict, float]:
+        """Kompakte Heatmap (siehe heatmap_codec) und Aufmerksamkeitsscore."""
+        if not self.frame_count:
+            return {}, 0.0
+        return encode_heatmap(self.heatmap), self.attention_score()
+
+
+class RollingEngagementWindow:
+    """
+    Ringpuffer der letzten `window_seconds` Frames für Live-Feedback.
+    Pro Frame werden nur Score und Blickvektor (3 Floats) gespeichert; die Kosten
+    pro Frame sind konstant und hängen nicht von der Sessionlänge ab.
+    """
+
+    def __init__(self, window_seconds: float = 5.0, max_fps: int = 60):
+        self.window_seconds = window_seconds
+        self.capacity = max(1, int(window_seconds * max_fps))
+        self._ts = np.zeros(self.capacity, dtype=np.float64)
+        self._score = np.zeros(self.capacity, dtype=np.float32)
+        self._x = np.zeros(self.capacity, dtype=np.float32)
+        self._y = np.zeros(self.capacity, dtype=np.float32)
+        self._head = 0   # nächster Schreibindex
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, timestamps: np.ndarray, matrix: np.ndarray) -> None:
+        if not len(matrix):
+            return
+        timestamps, matrix = timestamps[-self.capacity:], matrix[-self.capacity:]
+        x_gaze, y_gaze = gaze_vectors(matrix)
+        scores = attention_frame_scores(matrix)
+
+        n = len(timestamps)
+        idx = (self._head + np.arange(n)) % self.capacity
+        self._ts[idx] = timestamps
+        self._score[idx] = scores
+        self._x[idx] = x_gaze
+        self._y[idx] = y_gaze
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self.capacity, self._size + n)
+
+        # Frames außerhalb des Zeitfensters verwerfen
+        cutoff = float(timestamps[-1]) - self.window_seconds
+        valid = self._ts[self._window_index()] >= cutoff
+        self._size = int(valid.sum())
+
+    def _window_index(self) -> np.ndarray:
+        return (self._head - self._size + np.arange(self._size)) % self.capacity
+
+    def summary(self) -> dict:
+        """Rollierender Aufmerksamkeitsscore und Blickrichtung über das Fenster."""
+        if not self._size:
+            return {"frames": 0, "window_seconds": self.window_seconds, "attention_score": None, "gaze": None}
+        idx = self._window_index()
+        x, y = self._x[idx], self._y[idx]
+        mean_x, mean_y = float(x.mean()), float(y.mean())
+        if max(abs(mean_x), abs(mean_y)) < 0.1:
+            direction = "center"
+        elif abs(mean_x) >= abs(mean_y):
+            direction = "right" if mean_x > 0 else "left"
+        else:
+            direction = "up" if mean_y > 0 else "down"
+        return {
+            "frames": self._size,
+            "window_seconds": self.window_seconds,
+            "from": float(self._ts[idx[0]]),
+            "to": float(self._ts[idx[-1]]),
+            "attention_score": float(self._score[idx].mean(dtype=np.float64)),
+            "gaze": {
+                "x": mean_x,
+                "y": mean_y,
+                "direction": direction,
+                "looking_away_ratio": float((np.sqrt(x ** 2 + y ** 2) > 0.35).mean()),
+            },
+        }
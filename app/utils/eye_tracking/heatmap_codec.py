@@ -0,0 +1,138 @@
+"""
+Compact storage format for gaze heatmaps.
+
+A heatmap is stored as a dense little-endian uint32 grid (zlib, then base64)
+plus a small pyramid of coarser levels, each level summing 2×2 cells of the
+one above:
+
+    {"format": "pp-heatmap-1", "grid_size": 40, "frames": 1234,
+     "levels": [{"size": 40, "data": "..."}, {"size": 20, ...}, ...]}
+
+Grids are indexed [gx, gy] like `heatmap_counts`. Older results stored the
+sparse {"gx,gy": n} dict; `decode_heatmap` reads both. The API keeps
+returning the sparse dict (`legacy_heatmap`); the compact form is storage
+only, and `/heatmap` serves the grid at any resolution.
+"""
+
+import base64
+import zlib
+
+import numpy as np
+import pymupdf
+
+HEATMAP_FORMAT = "pp-heatmap-1"
+HEATMAP_MIN_LEVEL_SIZE = 5
+
+_CELL_DTYPE = np.dtype("<u4")
+
+
+def _pool2(counts: np.ndarray) -> np.ndarray:
+    """Sum 2×2 blocks; an odd edge is padded with zeros."""
+    n = counts.shape[0]
+    if n % 2:
+        counts = np.pad(counts, ((0, 1), (0, 1)))
+        n += 1
+    return counts.reshape(n // 2, 2, n // 2, 2).sum(axis=(1, 3), dtype=np.uint64)
+
+
+def heatmap_pyramid(counts: np.ndarray, min_size: int = HEATMAP_MIN_LEVEL_SIZE) -> list[np.ndarray]:
+    levels = [counts]
+    while levels[-1].shape[0] // 2 >= min_size:
+        levels.append(_pool2(levels[-1]))
+    return levels
+
+
+def _encode_grid(counts: np.ndarray) -> str:
+    raw = np.ascontiguousarray(counts, dtype=_CELL_DTYPE).tobytes()
+    return base64.b64encode(zlib.compress(raw)).decode("ascii")
+
+
+def _decode_grid(data: str, size: int) -> np.ndarray:
+    raw = zlib.decompress(base64.b64decode(data))
+    return np.frombuffer(raw, dtype=_CELL_DTYPE).reshape(size, size).astype(np.uint32)
+
+
+def encode_heatmap(counts: np.ndarray) -> dict:
+    """Dense grid plus pyramid, ready for a JSONB column."""
+    return {
+        "format": HEATMAP_FORMAT,
+        "grid_size": int(counts.shape[0]),
+        "frames": int(counts.sum(dtype=np.uint64)),
+        "levels": [
+            {"size": int(level.shape[0]), "data": _encode_grid(level)}
+            for level in heatmap_pyramid(counts)
+        ],
+    }
+
+
+def is_legacy_heatmap(payload: dict) -> bool:
+    return payload.get("format") != HEATMAP_FORMAT
+
+
+def decode_heatmap(payload: dict, grid_size: int = 40) -> np.ndarray:
+    """Full-resolution grid from a stored heatmap, compact or legacy {"gx,gy": n}."""
+    if not is_legacy_heatmap(payload):
+        top = payload["levels"][0]
+        return _decode_grid(top["data"], top["size"])
+
+    cells = np.array([tuple(map(int, key.split(","))) for key in payload], dtype=np.intp).reshape(-1, 2)
+    if len(cells):
+        grid_size = max(grid_size, int(cells.max()) + 1)
+    counts = np.zeros((grid_size, grid_size), dtype=np.uint32)
+    if len(cells):
+        counts[cells[:, 0], cells[:, 1]] = np.fromiter(payload.values(), dtype=np.uint32, count=len(payload))
+    return counts
+
+
+def legacy_heatmap(payload: dict | None) -> dict | None:
+    """The sparse {"gx,gy": n} dict API clients expect, from either stored format."""
+    if not payload or is_legacy_heatmap(payload):
+        return payload
+    counts = decode_heatmap(payload)
+    gxs, gys = np.nonzero(counts)
+    return {f"{gx},{gy}": int(counts[gx, gy]) for gx, gy in zip(gxs.tolist(), gys.tolist())}
+
+
+def heatmap_at_size(payload: dict, size: int) -> np.ndarray:
+    """
+    Grid at an arbitrary resolution not above the stored one. Stored pyramid
+    levels are returned as-is; any other size is sum-binned from the full grid,
+    so the total frame count is preserved either way.
+    """
+    if not is_legacy_heatmap(payload):
+        for level in payload["levels"]:
+            if level["size"] == size:
+                return _decode_grid(level["data"], size)
+    counts = decode_heatmap(payload)
+    n = counts.shape[0]
+    if size == n:
+        return counts
+    if not 1 <= size < n:
+        raise ValueError(f"size must be between 1 and {n}")
+    target = np.arange(n) * size // n
+    cells = (target[:, None] * size + target[None, :]).ravel()
+    return np.bincount(cells, weights=counts.ravel(), minlength=size * size).reshape(size, size).astype(np.uint32)
+
+
+def heatmap_to_rgb(counts: np.ndarray, cell_px: int = 8) -> np.ndarray:
+    """
+    (H, W, 3) uint8 image, gaze up at the top and right on the right.
+    Colour ramp black → red → yellow → white on sqrt-scaled counts.
+    """
+    image = counts.T[::-1].astype(np.float64)  # rows = gy from top, cols = gx
+    peak = image.max()
+    v = np.sqrt(image / peak) if peak else image
+    rgb = np.stack([
+        np.clip(v * 3, 0, 1),
+        np.clip(v * 3 - 1, 0, 1),
+        np.clip(v * 3 - 2, 0, 1),
+    ], axis=-1)
+    rgb = np.repeat(np.repeat(rgb, cell_px, axis=0), cell_px, axis=1)
+    return (rgb * 255).round().astype(np.uint8)
+
+
+def render_heatmap_png(counts: np.ndarray, cell_px: int = 8) -> bytes:
+    rgb = np.ascontiguousarray(heatmap_to_rgb(counts, cell_px))
+    height, width = rgb.shape[:2]
+    pix = pymupdf.Pixmap(pymupdf.csRGB, width, height, rgb.tobytes(), False)
+    return pix.tobytes("png")
@@ -49,12 +49,7 @@ def calculate_scores(findings: dict) -> dict:
     flight_path_score = score_for(3)
     cockpit_score = score_for(4)
 
-    total = (
-        preflight_score * settings.FINDING_WEIGHT_PREFLIGHT +
-        altitude_score * settings.FINDING_WEIGHT_ALTITUDE +
-        flight_path_score * settings.FINDING_WEIGHT_FLIGHT_PATH +
-        cockpit_score * settings.FINDING_WEIGHT_COCKPIT
-    )
+    total = findings_total_score(preflight_score, altitude_score, flight_path_score, cockpit_score)
 
     return {
         "total_score": round(total, 2),
@@ -63,3 +58,13 @@ def calculate_scores(findings: dict) -> dict:
         "flight_path_score": round(flight_path_score, 2),
         "cockpit_score": round(cockpit_score, 2),
     }
+
+
+def findings_total_score(preflight_score, altitude_score, flight_path_score, cockpit_score):
+    """Weighted content score; also takes NumPy arrays (used by the re-score command)."""
+    return (
+        preflight_score * settings.FINDING_WEIGHT_PREFLIGHT +
+        altitude_score * settings.FINDING_WEIGHT_ALTITUDE +
+        flight_path_score * settings.FINDING_WEIGHT_FLIGHT_PATH +
+        cockpit_score * settings.FINDING_WEIGHT_COCKPIT
+    )
@@ -1,60 +1,366 @@
+import asyncio
 import base64
+import hashlib
 import json
+import math
+import multiprocessing
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from io import BytesIO
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
 
 import pymupdf  
 from fastapi import UploadFile
-from app.utils.openai.openai_caller import get_findings_from_llm
+from app.schemas.findings_schema import SlideFindings
+from app.utils.openai.openai_caller import (
+    FINDINGS_PROMPT_VERSION,
+    FindingsTruncatedError,
+    get_findings_from_images,
+    get_findings_from_llm,
+    get_findings_from_text,
+)
 
 from app.core.config import settings
 
-PRESENTATION_BATCH_SIZE = settings.PRESENTATION_BATCH_SIZE
 PRESENTATION_MAX_WORKERS = settings.PRESENTATION_MAX_WORKERS
 
-def build_chunk(pdf, start: int, end: int):
+TEXT_PAGE = "text"
+VISUAL_PAGE = "visual"
+TITLE_SIZE_RATIO = 1.25
+
+# Rough token costs used to pack pages into calls (see plan_batches)
+CHARS_PER_TOKEN = 4
+PDF_PAGE_TOKENS = 1100          # a PDF page reaches the model as its text plus a page image
+EMBEDDED_IMAGE_TOKENS = 765     # one high-detail image
+OUTPUT_TOKENS_PER_PAGE = 250    # JSON skeleton plus a couple of findings
+OUTPUT_TOKENS_PER_TEXT_TOKEN = 0.3
+
+
+@dataclass
+class PageInfo:
+    index: int
+    key: str
+    mode: str
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def build_chunk(pdf, pages: List[int]):
     chunk = pymupdf.open()
-    for page_num in range(start, end):
+    for page_num in pages:
         chunk.insert_pdf(pdf, from_page=page_num, to_page=page_num)
     return chunk
 
 def encode_chunk_to_base64(chunk_pdf) -> str:
     buffer = BytesIO()
-    chunk_pdf.save(buffer, garbage=4, clean=True)
+    # no_new_id keeps the bytes of an unchanged chunk stable (LLM result cache key)
+    chunk_pdf.save(buffer, garbage=4, clean=True, no_new_id=True)
     buffer.seek(0)
     return base64.b64encode(buffer.read()).decode("utf-8")
 
 
-def process_presentation_file(file_like: BytesIO, descrption: str) -> dict:
-    """Split PDF, send chunks to LLM, merge all slide findings into one result."""
-    file_like.seek(0)
-    pdf = pymupdf.open(stream=file_like.read(), filetype="pdf")
-    results: List[tuple[int, List[Dict]]] = []
-
-    def process_chunk(start_page: int) -> tuple[int, List[Dict]]:
-        chunk_pdf = build_chunk(pdf, start_page, min(start_page + PRESENTATION_BATCH_SIZE, pdf.page_count))
-        encoded = encode_chunk_to_base64(chunk_pdf)
-        filename = f"slides_{start_page + 1}_to_{start_page + PRESENTATION_BATCH_SIZE}.pdf"
-        response = get_findings_from_llm(encoded, filename, descrption)
-        return start_page, response.slides
-
-    with ThreadPoolExecutor(max_workers=PRESENTATION_MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(process_chunk, i): i
-            for i in range(0, pdf.page_count, PRESENTATION_BATCH_SIZE)
-        }
-        for future in as_completed(futures):
-            start_index, findings = future.result()
-            results.append((start_index, findings))
+def page_structured_text(page) -> str:
+    """Page text in reading order, one line per text line, titles (large font) prefixed with '#'."""
+    lines = [
+        line
+        for block in page.get_text("dict", sort=True)["blocks"] if block["type"] == 0
+        for line in block["lines"]
+        if "".join(span["text"] for span in line["spans"]).strip()
+    ]
+    if not lines:
+        return ""
+    body_size = statistics.median(span["size"] for line in lines for span in line["spans"])
+    out = []
+    for line in lines:
+        text = "".join(span["text"] for span in line["spans"]).strip()
+        size = max(span["size"] for span in line["spans"])
+        out.append(f"# {text}" if size >= body_size * TITLE_SIZE_RATIO else text)
+    return "\n".join(out)
+
+
+def image_coverage(page) -> float:
+    """Share of the page area covered by embedded images."""
+    area = page.rect.get_area()
+    covered = sum((pymupdf.Rect(info["bbox"]) & page.rect).get_area() for info in page.get_image_info())
+    return min(1.0, covered / area) if area else 0.0
+
+
+def classify_page(page, text: str) -> str:
+    """Text-dominant pages can be analysed from their text alone; anything visual goes as PDF."""
+    if not settings.FINDINGS_TEXT_ROUTING or len(text) < settings.FINDINGS_TEXT_MIN_CHARS:
+        return VISUAL_PAGE
+    if image_coverage(page) > settings.FINDINGS_TEXT_MAX_IMAGE_COVERAGE:
+        return VISUAL_PAGE
+    if len(page.get_cdrawings()) > settings.FINDINGS_TEXT_MAX_DRAWINGS:
+        return VISUAL_PAGE
+    return TEXT_PAGE
+
+
+def page_route(mode: str) -> str:
+    """How a page is sent to the LLM; part of its cache key."""
+    if mode == TEXT_PAGE:
+        return mode
+    if settings.FINDINGS_VISUAL_MODE == "image":
+        return f"{mode}:image:{settings.FINDINGS_RASTER_DPI}:{settings.FINDINGS_RASTER_JPEG_QUALITY}"
+    return f"{mode}:pdf"
+
+
+def page_cache_key(page, description: str, mode: str) -> str:
+    """Hash of everything the findings of one page depend on: rendering, text, route, description, prompt."""
+    digest = hashlib.sha256(json.dumps([FINDINGS_PROMPT_VERSION, description, page_route(mode), page.get_text()]).encode())
+    digest.update(page.get_pixmap(dpi=settings.FINDINGS_CACHE_HASH_DPI).samples)
+    return digest.hexdigest()
+
+
+def image_input_tokens(width_px: float, height_px: float, detail: str) -> int:
+    """OpenAI vision cost: fit into 2048², shortest side to 768, then 170 per 512px tile + 85."""
+    if detail == "low":
+        return 85
+    scale = min(1.0, 2048 / max(width_px, height_px))
+    width_px, height_px = width_px * scale, height_px * scale
+    scale = min(1.0, 768 / min(width_px, height_px))
+    width_px, height_px = width_px * scale, height_px * scale
+    return 85 + 170 * math.ceil(width_px / 512) * math.ceil(height_px / 512)
+
+
+def estimate_tokens(page, mode: str, text: str) -> tuple[int, int]:
+    """(input, output) token estimate of one page on its route."""
+    text_tokens = math.ceil(len(text) / CHARS_PER_TOKEN)
+    if mode == TEXT_PAGE:
+        input_tokens = text_tokens + 10
+    elif settings.FINDINGS_VISUAL_MODE == "image":
+        zoom = settings.FINDINGS_RASTER_DPI / 72
+        input_tokens = image_input_tokens(page.rect.width * zoom, page.rect.height * zoom, settings.FINDINGS_RASTER_DETAIL)
+    else:
+        input_tokens = PDF_PAGE_TOKENS + text_tokens + EMBEDDED_IMAGE_TOKENS * len(page.get_images())
+    return input_tokens, OUTPUT_TOKENS_PER_PAGE + int(text_tokens * OUTPUT_TOKENS_PER_TEXT_TOKEN)
+
+
+def open_pdf(source: str | bytes) -> pymupdf.Document:
+    """Open by path (PyMuPDF reads pages from disk on demand) or from bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return pymupdf.open(stream=source, filetype="pdf")
+    return pymupdf.open(source, filetype="pdf")
+
+
+def analyse_pages(source, description: str):
+    """
+    Open the PDF (a path or a file object) and classify + hash every page in
+    one pass; returns (path or raw bytes, document, pages).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = os.fspath(source)
+    else:
+        source.seek(0)
+        source = source.read()
+    pdf = open_pdf(source)
+    pages = []
+    for page in pdf:
+        text = page_structured_text(page)
+        mode = classify_page(page, text)
+        pages.append(PageInfo(
+            page.number, page_cache_key(page, description, mode), mode, text, *estimate_tokens(page, mode, text)
+        ))
+    return source, pdf, pages
 
-    results.sort(key=lambda x: x[0])
 
-    merged_slides = []
-    for chunk_index, slides in results:
-        for i, slide in enumerate(slides):
-            slide.page = chunk_index + i
-            merged_slides.append(slide)
+_raster_pool: ProcessPoolExecutor | None = None
 
 
-    return {"slides": merged_slides}
+def raster_pool() -> ProcessPoolExecutor:
+    global _raster_pool
+    if _raster_pool is None:
+        # spawn, not fork: the worker runs threads (to_thread, httpx, asyncpg) whose
+        # locks a forked child could inherit in a held state
+        _raster_pool = ProcessPoolExecutor(
+            max_workers=settings.FINDINGS_RASTER_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _raster_pool
+
+
+def shutdown_raster_pool() -> None:
+    global _raster_pool
+    if _raster_pool is not None:
+        _raster_pool.shutdown(cancel_futures=True)
+        _raster_pool = None
+
+
+def render_pages_to_jpeg(pdf_source: str | bytes, numbers: List[int], dpi: int, quality: int) -> List[tuple[int, str]]:
+    """Runs in the raster pool: PyMuPDF holds the GIL while rendering."""
+    pdf = open_pdf(pdf_source)
+    return [
+        (n, base64.b64encode(pdf[n].get_pixmap(dpi=dpi).tobytes("jpg", jpg_quality=quality)).decode("ascii"))
+        for n in numbers
+    ]
+
+
+async def render_pages(pdf_source: str | bytes, numbers: List[int]) -> Dict[int, str]:
+    """Base64 JPEG per page, rendered across the raster pool. Pass a path so the PDF is not pickled to every worker."""
+    if not numbers:
+        return {}
+    loop = asyncio.get_running_loop()
+    per_task = math.ceil(len(numbers) / settings.FINDINGS_RASTER_PROCESSES)
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(
+            raster_pool(), render_pages_to_jpeg, pdf_source, numbers[i:i + per_task],
+            settings.FINDINGS_RASTER_DPI, settings.FINDINGS_RASTER_JPEG_QUALITY,
+        )
+        for i in range(0, len(numbers), per_task)
+    ))
+    return dict(image for part in parts for image in part)
+
+
+def plan_batches(pages: List[PageInfo]) -> List[List[PageInfo]]:
+    """
+    Pack pages (in page order, one route per batch) into as few calls as the
+    input budget, the expected output and the page cap allow.
+    """
+    max_output = settings.FINDINGS_MAX_OUTPUT_TOKENS * settings.FINDINGS_BATCH_OUTPUT_SHARE
+    batches = []
+    for mode in (TEXT_PAGE, VISUAL_PAGE):
+        batch, input_tokens, output_tokens = [], 0, 0
+        for page in (p for p in pages if p.mode == mode):
+            if batch and (
+                len(batch) >= settings.FINDINGS_MAX_PAGES_PER_CALL
+                or input_tokens + page.input_tokens > settings.FINDINGS_BATCH_INPUT_TOKENS
+                or output_tokens + page.output_tokens > max_output
+            ):
+                batches.append(batch)
+                batch, input_tokens, output_tokens = [], 0, 0
+            batch.append(page)
+            input_tokens += page.input_tokens
+            output_tokens += page.output_tokens
+        if batch:
+            batches.append(batch)
+    return batches
+
+
+def encode_pdf_batch(pdf, numbers: List[int]) -> str:
+    return encode_chunk_to_base64(build_chunk(pdf, numbers))
+
+
+async def process_presentation_file(
+    source, descrption: str, cache=None, on_slides=None, partial_after: float | None = None, llm_cache=None
+) -> dict:
+    """
+    Split PDF, send chunks to LLM, merge all slide findings into one result.
+    `source` is a path (preferred, the deck is never held in memory as a
+    whole) or a file object.
+    Text-dominant pages are sent as extracted text, the rest as PDF or, with
+    FINDINGS_VISUAL_MODE="image", as downscaled JPEG renders. Pages are packed
+    into calls by estimated token cost; a call whose answer is cut off is split
+    in half and retried. With a `cache` (see SlideFindingsCache) pages whose
+    content hash is known are taken from it and only the remaining pages are
+    sent to the LLM. `on_slides(slides)` is awaited with the cached slides
+    and then with the slides of every call as soon as they are validated.
+    With `partial_after` seconds, calls still running by then are cancelled
+    and their pages listed under "pending_pages" instead of being waited for.
+    `llm_cache` (see LLMResultCache) answers repeated identical calls.
+    """
+    pdf_source, pdf, pages = await asyncio.to_thread(analyse_pages, source, descrption)
+    keys = [p.key for p in pages]
+    cached = await cache.get_many(keys) if cache is not None else {}
+    results: List[tuple[int, SlideFindings]] = [
+        (p.index, SlideFindings.model_validate({"page": p.index, "findings": cached[p.key]}))
+        for p in pages if p.key in cached
+    ]
+    if results and on_slides is not None:
+        await on_slides([slide for _, slide in results])
+    misses = [p for p in pages if p.key not in cached]
+    batches = plan_batches(misses)
+    print(
+        f"[FINDINGS] {len(pages) - len(misses)}/{len(pages)} pages from cache, "
+        f"{sum(p.mode == TEXT_PAGE for p in misses)} of {len(misses)} sent as text, "
+        f"{len(batches)} call(s)"
+    )
+
+    images = None
+    if settings.FINDINGS_VISUAL_MODE == "image":
+        images = await render_pages(pdf_source, [p.index for p in misses if p.mode == VISUAL_PAGE])
+    # Per-deck cap; the gateway additionally caps all findings calls of this process
+    limit = asyncio.Semaphore(PRESENTATION_MAX_WORKERS)
+    # PyMuPDF is not thread-safe: one PDF re-save at a time
+    pdf_lock = asyncio.Lock()
+
+    async def request(batch: List[PageInfo]) -> List[Dict]:
+        numbers = [p.index for p in batch]
+        estimated_tokens = sum(p.input_tokens for p in batch)
+        if batch[0].mode == TEXT_PAGE:
+            payload = "\n\n".join(f"--- Slide {p.index + 1} ---\n{p.text}" for p in batch)
+            async with limit:
+                return (await get_findings_from_text(payload, descrption, estimated_tokens, llm_cache)).slides
+        if images is not None:
+            async with limit:
+                return (await get_findings_from_images(
+                    [images[n] for n in numbers], [n + 1 for n in numbers], descrption, estimated_tokens, llm_cache
+                )).slides
+        async with pdf_lock:
+            payload = await asyncio.to_thread(encode_pdf_batch, pdf, numbers)
+        filename = f"slides_{numbers[0] + 1}_to_{numbers[-1] + 1}.pdf"
+        async with limit:
+            return (await get_findings_from_llm(payload, filename, descrption, estimated_tokens, llm_cache)).slides
+
+    parts: List[tuple[List[int], List[SlideFindings]]] = []
+
+    async def process_batch(batch: List[PageInfo]) -> None:
+        numbers = [p.index for p in batch]
+        try:
+            slides = await request(batch)
+        except FindingsTruncatedError:
+            if len(batch) == 1:
+                raise
+            reason = "truncated"
+        else:
+            # Entries map to pages by position; with a count mismatch on a
+            # multi-page call that mapping is unknown, so the call is split
+            if len(slides) == len(numbers) or len(batch) == 1:
+                slides = slides[:len(numbers)]
+                for page, slide in zip(numbers, slides):
+                    slide.page = page
+                parts.append((numbers, slides))
+                if on_slides is not None:
+                    await on_slides(slides)
+                return
+            reason = f"has {len(slides)} entries for {len(numbers)} pages"
+        half = len(batch) // 2
+        print(f"[FINDINGS] answer for pages {batch[0].index + 1}-{batch[-1].index + 1} {reason}, splitting")
+        await process_batch(batch[:half])
+        await process_batch(batch[half:])
+
+    async def cancel_stragglers(tasks: List[asyncio.Task]) -> None:
+        _, pending = await asyncio.wait(tasks, timeout=partial_after)
+        for task in pending:
+            task.cancel()
+
+    # A failing batch cancels the calls still in flight; stragglers cancelled
+    # by the partial-result timer just leave their pages pending
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(process_batch(batch)) for batch in batches]
+            if partial_after and tasks:
+                group.create_task(cancel_stragglers(tasks))
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0]
+
+    fresh = {}
+    done_pages = set()
+    for numbers, slides in parts:
+        results.extend((slide.page, slide) for slide in slides)
+        done_pages.update(numbers)
+        # A single page answered without an entry is not cached
+        if len(slides) == len(numbers):
+            fresh.update({keys[page]: slide for page, slide in zip(numbers, slides)})
+    if cache is not None:
+        await cache.put_many(fresh)
+
+    results.sort(key=lambda x: x[0])
+    findings = {"slides": [slide for _, slide in results]}
+    pending_pages = sorted(p.index for p in misses if p.index not in done_pages)
+    if pending_pages:
+        print(f"[FINDINGS] {len(pending_pages)} page(s) still pending after {partial_after:g}s, returning partial result")
+        findings["pending_pages"] = pending_pages
+    return findings
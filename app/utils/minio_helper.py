@@ -1,7 +1,9 @@
 
 from datetime import timedelta
 from io import BytesIO
+import os
 import pathlib
+from typing import BinaryIO
 from uuid import uuid4
 from fastapi import UploadFile
 from minio import Minio, S3Error
@@ -26,18 +28,28 @@ public = Minio(
 )
 
 
-def upload_file_to_minio(file_buffer: BytesIO, filename: str, prefix: str = "presentations", content_type: str = "application/pdf") -> str:
+def upload_file_to_minio(file_buffer: BinaryIO, filename: str, prefix: str = "presentations", content_type: str = "application/pdf") -> str:
+    """
+    Stream a file object into the bucket. Seekable files (BytesIO, the spooled
+    temp file behind an UploadFile) are sent with their size, anything else as
+    an unknown-length multipart upload; either way MinIO reads at most one
+    MINIO_UPLOAD_PART_SIZE part into memory at a time.
+    """
     ext = filename.split(".")[-1]
     obj = f"{prefix}/{uuid4()}.{ext}"
 
-    file_buffer.seek(0)  # Always rewind
+    length = -1
+    if file_buffer.seekable():
+        length = file_buffer.seek(0, os.SEEK_END)
+        file_buffer.seek(0)  # Always rewind
     try:
         internal.put_object(
             bucket_name=BUCKET,
             object_name=obj,
             data=file_buffer,
-            length=len(file_buffer.getbuffer()),
+            length=length,
             content_type=content_type,
+            part_size=settings.MINIO_UPLOAD_PART_SIZE,
         )
         return f"{settings.MINIO_PUBLIC_ENDPOINT.rstrip('/')}/{BUCKET}/{obj}"
     except S3Error as e:
@@ -78,12 +90,21 @@ def public_object_url(key: str) -> str:
     """Return a bucket-public URL usable by browsers without signing."""
     return f"{settings.MINIO_PUBLIC_ENDPOINT.rstrip('/')}/{BUCKET}/{key}"
 
-def download_object_to_tmpfile(key: str) -> pathlib.Path:
+def download_object_to_tmpfile(key: str, suffix: str = ".webm") -> pathlib.Path:
     """
     Downloads a MinIO object to a temporary file and returns its Path.
+    The caller deletes the file.
     """
     import tempfile
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".webm")
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    tmp.close()
     internal.fget_object(BUCKET, key, tmp.name)
     return pathlib.Path(tmp.name)
 
+
+def object_key_from_public_url(url: str) -> str:
+    """Inverse of `public_object_url`: strip endpoint and bucket from a stored file URL."""
+    base = f"{settings.MINIO_PUBLIC_ENDPOINT.rstrip('/')}/{BUCKET}/"
+    if not url.startswith(base):
+        raise ValueError(f"URL {url} does not point into bucket {BUCKET}")
+    return url[len(base):]
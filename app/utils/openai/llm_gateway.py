@@ -0,0 +1,236 @@
+"""
+app/utils/openai/llm_gateway.py
+────────────────────────────────────────────────────────────────
+Single async entry point for OpenAI calls.
+
+* one `AsyncOpenAI` client per process on a shared, bounded httpx pool,
+  bound to one event loop until `close()`
+* per call type timeout (LLM_TIMEOUT_SECONDS) and concurrency cap
+  (LLM_CONCURRENCY), so a burst of uploads queues on a semaphore instead of
+  spawning threads or opening unbounded connections
+* calls are plain coroutines: cancelling the awaiting task aborts the HTTP
+  request, which is how sibling chunk calls are torn down when one fails
+* every call first waits for request / token budget from the process-wide
+  `RateGovernor`, in the priority class of its kind (LLM_PRIORITY)
+* `hedged` runs a whole call (request + validation) under the kind's deadline
+  (LLM_DEADLINE_SECONDS) and, for kinds in LLM_HEDGE_QUANTILE, fires a
+  duplicate once the first attempt is slower than that quantile of the
+  latencies seen so far; the first valid answer wins
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from openai import AsyncOpenAI, RateLimitError
+
+from app.core.config import settings
+from app.utils.openai.rate_governor import RateGovernor, estimate_request_tokens
+
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PRIORITY = 10
+
+T = TypeVar("T")
+
+
+class LatencyHistogram:
+    """Call latencies in log-spaced buckets (100 ms · 1.25ⁿ, up to ~10 min)."""
+
+    BOUNDS = [0.1 * 1.25 ** i for i in range(40)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile; None without samples."""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.BOUNDS[min(i, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+
+class LLMGateway:
+    def __init__(self):
+        self._client: AsyncOpenAI | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._governor: RateGovernor | None = None
+        self._in_flight: dict[str, int] = {}
+        self._calls: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._latency: dict[str, LatencyHistogram] = {}
+        self._hedges: dict[str, int] = {}
+        self._hedge_wins: dict[str, int] = {}
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # httpx pools and semaphores are bound to the loop that first uses them;
+        # silently replacing them would leak the old connection pool
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            raise RuntimeError("LLM gateway is bound to another event loop; await llm_gateway.close() on it first")
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=settings.LLM_MAX_RETRIES,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                    timeout=httpx.Timeout(DEFAULT_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+                ),
+            )
+            self._loop = loop
+            self._semaphores = {}
+            self._governor = None
+        return self._client
+
+    @property
+    def governor(self) -> RateGovernor:
+        if self._governor is None:
+            self._governor = RateGovernor(settings.LLM_RPM_LIMIT, settings.LLM_TPM_LIMIT)
+        return self._governor
+
+    def _semaphore(self, kind: str) -> asyncio.Semaphore:
+        if kind not in self._semaphores:
+            self._semaphores[kind] = asyncio.Semaphore(settings.LLM_CONCURRENCY.get(kind, DEFAULT_CONCURRENCY))
+        return self._semaphores[kind]
+
+    async def create_response(self, kind: str, estimated_tokens: int | None = None, **request):
+        """
+        `client.responses.create` under the rate budget, timeout and concurrency
+        cap of `kind`. `estimated_tokens` (input only) overrides the estimate
+        derived from the request.
+        """
+        client = self.client
+        timeout = settings.LLM_TIMEOUT_SECONDS.get(kind, DEFAULT_TIMEOUT_SECONDS)
+        if estimated_tokens is None:
+            estimated_tokens = estimate_request_tokens(request)
+        governor = self.governor
+        reserved = await governor.acquire(
+            settings.LLM_PRIORITY.get(kind, DEFAULT_PRIORITY),
+            estimated_tokens + request.get("max_output_tokens", 0),
+        )
+        # Settled on every path: a failed, timed-out or cancelled call (e.g. a
+        # hedge loser) never produced its output, so only its input is charged.
+        # After a 429 nothing is handed back, the buckets stay drained.
+        used = 0
+        try:
+            async with self._semaphore(kind):
+                self._in_flight[kind] = self._in_flight.get(kind, 0) + 1
+                self._calls[kind] = self._calls.get(kind, 0) + 1
+                started = time.monotonic()
+                used = min(estimated_tokens, reserved)
+                try:
+                    response = await client.responses.create(timeout=timeout, **request)
+                    self._latency.setdefault(kind, LatencyHistogram()).record(time.monotonic() - started)
+                except Exception as e:
+                    self._errors[kind] = self._errors.get(kind, 0) + 1
+                    if isinstance(e, RateLimitError):
+                        governor.rate_limited_by_provider()
+                        used = reserved
+                    raise
+                finally:
+                    self._in_flight[kind] -= 1
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None) or used
+        finally:
+            governor.settle(reserved, used)
+        return response
+
+    def hedge_delay(self, kind: str) -> float | None:
+        """Seconds after which a duplicate is fired; None if `kind` is not hedged (yet)."""
+        quantile = settings.LLM_HEDGE_QUANTILE.get(kind)
+        histogram = self._latency.get(kind)
+        if quantile is None or histogram is None or histogram.total < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(histogram.quantile(quantile), settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    async def hedged(self, kind: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await `attempt()` (one complete call including validation) within the
+        deadline of `kind`. If the kind is hedged and the attempt is still
+        running after `hedge_delay`, a second attempt is started; whichever
+        returns first wins and the other is cancelled. An error of one attempt
+        only counts once the other failed as well.
+        """
+        deadline = settings.LLM_DEADLINE_SECONDS.get(kind)
+        attempts: list[asyncio.Task] = []
+        timeout = asyncio.timeout(deadline)
+        try:
+            async with timeout:
+                delay = self.hedge_delay(kind)
+                if delay is None:
+                    return await attempt()
+                attempts.append(asyncio.ensure_future(attempt()))
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    self._hedges[kind] = self._hedges.get(kind, 0) + 1
+                    attempts.append(asyncio.ensure_future(attempt()))
+                pending = set(attempts)
+                error = None
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if len(attempts) > 1 and task is attempts[1]:
+                                self._hedge_wins[kind] = self._hedge_wins.get(kind, 0) + 1
+                            return task.result()
+                        error = error or task.exception()
+                raise error
+        except TimeoutError as e:
+            if not timeout.expired():
+                raise
+            raise TimeoutError(f"{kind} call exceeded its {deadline:g}s deadline") from e
+        finally:
+            for task in attempts:
+                task.cancel()
+            # Let the losers unwind (semaphore, governor reservation) before returning
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "governor": self._governor.stats() if self._governor is not None else None,
+            "kinds": self.kind_stats(),
+        }
+
+    def kind_stats(self) -> dict:
+        return {
+            kind: {
+                "in_flight": self._in_flight.get(kind, 0),
+                "calls": self._calls.get(kind, 0),
+                "errors": self._errors.get(kind, 0),
+                "limit": settings.LLM_CONCURRENCY.get(kind, DEFAULT_CONCURRENCY),
+                "p50_seconds": self._latency[kind].quantile(0.5) if kind in self._latency else None,
+                "p95_seconds": self._latency[kind].quantile(0.95) if kind in self._latency else None,
+                "hedges": self._hedges.get(kind, 0),
+                "hedge_wins": self._hedge_wins.get(kind, 0),
+            }
+            for kind in sorted(set(settings.LLM_CONCURRENCY) | set(self._calls))
+        }
+
+    async def close(self) -> None:
+        """Close the connection pool; the next call binds the gateway to the then running loop."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loop = None
+
+
+llm_gateway = LLMGateway()
@@ -1,5 +1,7 @@
+import hashlib
 import json
-from .openai_client import client
+from .llm_gateway import llm_gateway
+from app.core.config import settings
 from app.schemas.findings_schema import FindingsResponse
 
 _SYSTEM_PROMPT = """You are a world-class expert in presentation design, slide communication, and pedagogical feedback for academic and professional contexts.
@@ -7,7 +9,7 @@ Your goal is to critically analyze and improve presentation slides by detecting
 
 Instructions Overview
 
-You will receive up to two slides from a presentation. Analyze each slide individually and return your evaluation in the required JSON schema. All feedback must be:
+You will receive one or more slides from a presentation. Analyze each slide individually and return your evaluation in the required JSON schema. All feedback must be:
 
 Accurate
 Concise
@@ -440,79 +442,183 @@ _AUDIO_ANALYZE_SCHEMA = {
 }
 
 
-def get_findings_from_llm(base64_string: str, filename: str, description: str) -> dict:
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=[
-            {
-                "role": "system",
-                "content": [{"type": "input_text", "text": _SYSTEM_PROMPT}]
+FINDINGS_MODEL = "gpt-4.1-mini"
+
+
+class FindingsTruncatedError(Exception):
+    """The findings answer hit the output limit (or is cut-off JSON); retry with fewer slides."""
+
+_FINDINGS_USER_PROMPT = "Analyze these slides deeply and give me the world-best constructive feedback. This is a presentation about: {description}. Please follow the instructions strictly and return the findings in the required JSON format."
+_FINDINGS_TEXT_PROMPT = "These slides were extracted as text: one '--- Slide n ---' section per slide, lines starting with '#' are titles. Fonts, colours, spacing and images could not be inspected, so only report visual (type 4) findings that show in the text itself, such as walls of text, overlong bullet lists or too much text per slide. Return one entry per slide, in order."
+_FINDINGS_IMAGE_PROMPT = "These slides are attached as rendered images, one image per slide, in order: {slides}. Return one entry per slide, in order."
+
+# Changes whenever anything that shapes the findings changes; part of the slide cache key
+FINDINGS_PROMPT_VERSION = hashlib.sha256(
+    json.dumps(
+        [FINDINGS_MODEL, _SYSTEM_PROMPT, _FINDINGS_USER_PROMPT, _FINDINGS_TEXT_PROMPT, _FINDINGS_IMAGE_PROMPT, _RESPONSE_SCHEMA],
+        sort_keys=True,
+    ).encode()
+).hexdigest()[:16]
+
+
+AUDIO_FEEDBACK_MODEL = "gpt-4.1-mini"
+
+AUDIO_FEEDBACK_PROMPT_VERSION = hashlib.sha256(
+    json.dumps([AUDIO_FEEDBACK_MODEL, _AUDIO_ANALYZE_PROMPT, _AUDIO_ANALYZE_SCHEMA], sort_keys=True).encode()
+).hexdigest()[:16]
+
+
+async def _cached(llm_cache, kind: str, key_parts: list, call):
+    """Route `call` through an LLMResultCache-like `llm_cache` (anything with `get_or_call`), if given."""
+    if llm_cache is None:
+        return await call()
+    return await llm_cache.get_or_call(kind, key_parts, call)
+
+
+async def _request_findings(
+    content: list[dict], estimated_tokens: int | None = None, llm_cache=None
+) -> FindingsResponse:
+    if estimated_tokens is not None:
+        estimated_tokens += (len(_SYSTEM_PROMPT) + len(_FINDINGS_USER_PROMPT)) // 4
+
+    async def attempt() -> FindingsResponse:
+        response = await llm_gateway.create_response(
+            "findings",
+            estimated_tokens=estimated_tokens,
+            model=FINDINGS_MODEL,
+            input=[
+                {
+                    "role": "system",
+                    "content": [{"type": "input_text", "text": _SYSTEM_PROMPT}]
+                },
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ],
+           text={
+                "format": {
+                    "type": "json_schema",
+                    "name": "Response",         
+                    "strict": False,
+                    "schema": _RESPONSE_SCHEMA["schema"]
+                }
             },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "input_text", 
-                        "text": f"Analyze these slides deeply and give me the world-best constructive feedback. This is a presentation about: {description}. Please follow the instructions strictly and return the findings in the required JSON format."
-                    },
-                    {
-                        "type": "input_file",
-                        "filename": filename,
-                        "file_data": f"data:application/pdf;base64,{base64_string}",
-                    }
-                ]
-            }
-        ],
-       text={
-            "format": {
-                "type": "json_schema",
-                "name": "Response",         
-                "strict": False,
-                "schema": _RESPONSE_SCHEMA["schema"]
-            }
+            temperature=0,
+            max_output_tokens=settings.FINDINGS_MAX_OUTPUT_TOKENS,
+            top_p=1,
+            store=True
+        )
+
+        if getattr(response, "status", None) == "incomplete":
+            raise FindingsTruncatedError(getattr(response.incomplete_details, "reason", "incomplete"))
+        try:
+            parsed_json = json.loads(response.output_text)
+        except json.JSONDecodeError as e:
+            raise FindingsTruncatedError(f"unparseable JSON: {e}") from e
+        validated = FindingsResponse.model_validate(parsed_json)
+        return validated
+
+    async def call() -> dict:
+        return (await llm_gateway.hedged("findings", attempt)).model_dump()
+
+    key_parts = [FINDINGS_PROMPT_VERSION, settings.FINDINGS_MAX_OUTPUT_TOKENS, content]
+    return FindingsResponse.model_validate(await _cached(llm_cache, "findings", key_parts, call))
+
+
+async def get_findings_from_llm(
+    base64_string: str, filename: str, description: str, estimated_tokens: int | None = None, llm_cache=None
+) -> FindingsResponse:
+    return await _request_findings([
+        {
+            "type": "input_text", 
+            "text": _FINDINGS_USER_PROMPT.format(description=description)
         },
-        temperature=0,
-        max_output_tokens=2048,
-        top_p=1,
-        store=True
-    )
+        {
+            "type": "input_file",
+            "filename": filename,
+            "file_data": f"data:application/pdf;base64,{base64_string}",
+        }
+    ], estimated_tokens, llm_cache)
 
-    parsed_json = json.loads(response.output_text)
-    validated = FindingsResponse.model_validate(parsed_json)
-    return validated
 
+async def get_findings_from_text(
+    slides_text: str, description: str, estimated_tokens: int | None = None, llm_cache=None
+) -> FindingsResponse:
+    """Same analysis for slides sent as extracted text instead of a PDF."""
+    return await _request_findings([
+        {
+            "type": "input_text",
+            "text": _FINDINGS_USER_PROMPT.format(description=description)
+        },
+        {
+            "type": "input_text",
+            "text": f"{_FINDINGS_TEXT_PROMPT}\n\n{slides_text}"
+        }
+    ], estimated_tokens, llm_cache)
 
 
-def get_audio_feedback_from_llm(transcript_text: str) -> dict:
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=[
-            {
-                "role": "system",
-                "content": [{"type": "input_text", "text": _AUDIO_ANALYZE_PROMPT}]
-            },
+async def get_findings_from_images(
+    images: list[str], slide_numbers: list[int], description: str, estimated_tokens: int | None = None, llm_cache=None
+) -> FindingsResponse:
+    """Same analysis for slides sent as base64 JPEG renders."""
+    return await _request_findings([
+        {
+            "type": "input_text",
+            "text": _FINDINGS_USER_PROMPT.format(description=description)
+        },
+        {
+            "type": "input_text",
+            "text": _FINDINGS_IMAGE_PROMPT.format(slides=", ".join(str(n) for n in slide_numbers))
+        },
+        *[
             {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "input_text",
-                        "text": transcript_text
-                    }
-                ]
+                "type": "input_image",
+                "image_url": f"data:image/jpeg;base64,{image}",
+                "detail": settings.FINDINGS_RASTER_DETAIL,
             }
-        ],
-        text={
-            "format": {
-                "type": "json_schema",
-                "name": "AudioFeedback",
-                "strict": False,
-                "schema": _AUDIO_ANALYZE_SCHEMA["schema"]
-            }
-        },
-        temperature=0,
-        max_output_tokens=2048,
-        top_p=1,
-        store=True
-    )
+            for image in images
+        ]
+    ], estimated_tokens, llm_cache)
+
+
+async def get_audio_feedback_from_llm(transcript_text: str, llm_cache=None) -> dict:
+    async def attempt() -> dict:
+        response = await llm_gateway.create_response(
+            "audio_feedback",
+            model=AUDIO_FEEDBACK_MODEL,
+            input=[
+                {
+                    "role": "system",
+                    "content": [{"type": "input_text", "text": _AUDIO_ANALYZE_PROMPT}]
+                },
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "input_text",
+                            "text": transcript_text
+                        }
+                    ]
+                }
+            ],
+            text={
+                "format": {
+                    "type": "json_schema",
+                    "name": "AudioFeedback",
+                    "strict": False,
+                    "schema": _AUDIO_ANALYZE_SCHEMA["schema"]
+                }
+            },
+            temperature=0,
+            max_output_tokens=2048,
+            top_p=1,
+            store=True
+        )
+
+        return json.loads(response.output_text)
+
+    async def call() -> dict:
+        return await llm_gateway.hedged("audio_feedback", attempt)
 
-    return json.loads(response.output_text)
+    return await _cached(llm_cache, "audio_feedback", [AUDIO_FEEDBACK_PROMPT_VERSION, transcript_text], call)
@@ -0,0 +1,147 @@
+"""
+app/utils/openai/rate_governor.py
+────────────────────────────────────────────────────────────────
+Process-wide request / token budget for OpenAI calls.
+
+* two token buckets, refilled continuously: LLM_RPM_LIMIT requests and
+  LLM_TPM_LIMIT tokens per minute
+* a call reserves its estimated input tokens plus `max_output_tokens`; once
+  the response reports its usage the difference is handed back (`settle`).
+  Calls that fail, time out or are cancelled are settled at their input estimate
+* waiters are served strictly by priority class (LLM_PRIORITY, lower first),
+  FIFO within a class, so an interactive finish overtakes queued deck chunks
+* a 429 empties both buckets, pausing everybody instead of letting every
+  caller retry into the limit
+
+Limits are per process: with several workers, split the organisation limits
+between them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = {"low": 85, "high": 765, "auto": 765}
+FILE_BYTES_PER_TOKEN = 40  # PDFs: text plus page images, very rough
+
+
+def estimate_request_tokens(request: dict) -> int:
+    """Input tokens of a `responses.create` request, from its text and attachment sizes."""
+    tokens = 0
+    for message in request.get("input", []):
+        for part in message.get("content", []):
+            if part["type"] == "input_text":
+                tokens += len(part["text"]) // CHARS_PER_TOKEN
+            elif part["type"] == "input_image":
+                tokens += IMAGE_TOKENS.get(part.get("detail", "auto"), IMAGE_TOKENS["auto"])
+            elif part["type"] == "input_file":
+                tokens += len(part.get("file_data", "")) * 3 // 4 // FILE_BYTES_PER_TOKEN
+    return tokens
+
+
+class RateGovernor:
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._refilled_at = time.monotonic()
+        self._queue: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._condition = asyncio.Condition()
+        self._queued: dict[int, int] = {}
+        self._granted: dict[int, int] = {}
+        self._wait_seconds: dict[int, float] = {}
+        self._max_wait_seconds: dict[int, float] = {}
+        self.rate_limited = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _delay(self, tokens: int) -> float:
+        """Seconds until both buckets can cover one request of `tokens`."""
+        missing_requests = max(0.0, 1 - self._requests)
+        missing_tokens = max(0.0, tokens - self._tokens)
+        return max(missing_requests * 60 / self.rpm, missing_tokens * 60 / self.tpm)
+
+    async def acquire(self, priority: int, tokens: int) -> int:
+        """Wait for budget; returns the reserved tokens to pass to `settle`."""
+        # A request larger than the whole bucket would never fit otherwise
+        tokens = min(tokens, self.tpm)
+        waiter = (priority, next(self._seq))
+        started = time.monotonic()
+        self._queued[priority] = self._queued.get(priority, 0) + 1
+        async with self._condition:
+            heapq.heappush(self._queue, waiter)
+            try:
+                while True:
+                    self._refill()
+                    timeout = None
+                    if self._queue[0] == waiter:
+                        timeout = self._delay(tokens)
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+            finally:
+                self._queued[priority] -= 1
+
+            heapq.heappop(self._queue)
+            self._requests -= 1
+            self._tokens -= tokens
+            self._condition.notify_all()
+
+        waited = time.monotonic() - started
+        self._granted[priority] = self._granted.get(priority, 0) + 1
+        self._wait_seconds[priority] = self._wait_seconds.get(priority, 0.0) + waited
+        self._max_wait_seconds[priority] = max(self._max_wait_seconds.get(priority, 0.0), waited)
+        return tokens
+
+    def settle(self, reserved: int, used: int | None) -> None:
+        """Hand back (or charge) the difference between reservation and reported usage."""
+        if used is None:
+            return
+        self._refill()
+        self._tokens = min(self.tpm, self._tokens + reserved - used)
+
+    def rate_limited_by_provider(self) -> None:
+        self.rate_limited += 1
+        self._refill()
+        self._requests = min(self._requests, 0.0)
+        self._tokens = min(self._tokens, 0.0)
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "requests_available": round(self._requests, 1),
+            "tokens_available": round(self._tokens),
+            "rate_limited": self.rate_limited,
+            "priorities": {
+                priority: {
+                    "queued": self._queued.get(priority, 0),
+                    "granted": self._granted.get(priority, 0),
+                    "avg_wait_ms": round(
+                        self._wait_seconds.get(priority, 0.0) / self._granted[priority] * 1000, 2
+                    ) if self._granted.get(priority) else 0.0,
+                    "max_wait_ms": round(self._max_wait_seconds.get(priority, 0.0) * 1000, 2),
+                }
+                for priority in sorted(set(self._queued) | set(self._granted))
+            },
+        }
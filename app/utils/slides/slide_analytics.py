@@ -0,0 +1,141 @@
+"""
+app/utils/slides/slide_analytics.py
+────────────────────────────────────────────────────────────────
+Per-slide breakdown of a training, built by joining `Training.slide_events`
+with the blendshape frame timeline and the Whisper word / volume timelines.
+
+Every timeline is assigned to slide intervals with one `np.searchsorted`
+against the sorted slide-change times; aggregation per page is a `bincount`.
+Blendshape frames are folded into a `SlideTimeline` chunk by chunk as they
+are read, so the finish job never decodes the whole training into one matrix.
+
+Time bases: slide events and blendshape frames share the client clock
+(seconds since training start). The audio timelines start at zero when the
+recording starts, which is the first slide event, so they are shifted by
+that timestamp. Frames before the first slide event belong to no slide.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.eye_tracking.eye_tracking import (
+    attention_frame_scores,
+    gaze_vectors,
+    heatmap_cells,
+)
+from app.utils.eye_tracking.heatmap_codec import encode_heatmap
+
+
+def assign_intervals(change_times: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Index of the interval each time falls into; -1 before the first change."""
+    return np.searchsorted(change_times, times, side="right") - 1
+
+
+def _per_page(segments: np.ndarray, seg_page: np.ndarray, n_pages: int, weights=None) -> np.ndarray:
+    valid = segments >= 0
+    return np.bincount(
+        seg_page[segments[valid]],
+        weights=None if weights is None else weights[valid],
+        minlength=n_pages,
+    )
+
+
+class SlideTimeline:
+    """
+    Slide intervals of a training plus per-page eye-tracking sums.
+    Revisited pages are folded into one entry; `visits` counts how often the
+    page was shown.
+    """
+
+    def __init__(self, slide_events: list[dict], grid_size: int | None = None):
+        if not slide_events:
+            raise ValueError("a slide timeline needs at least one slide event")
+        self.grid_size = grid_size or settings.EYE_TRACKING_GRID_SIZE
+        events = sorted(slide_events, key=lambda e: e["timestamp"])
+        self.change_times = np.array([e["timestamp"] for e in events], dtype=np.float64)
+        self.pages, self.seg_page = np.unique(np.array([e["page"] for e in events]), return_inverse=True)
+        self.n_pages = len(self.pages)
+
+        cells = self.grid_size * self.grid_size
+        self.frame_count = np.zeros(self.n_pages, dtype=np.int64)
+        self.attention_sum = np.zeros(self.n_pages, dtype=np.float64)
+        self.heatmaps = np.zeros(self.n_pages * cells, dtype=np.int64)
+        self.last_frame_ts: float | None = None
+
+    @property
+    def start(self) -> float:
+        """First slide event, i.e. the start of the recording."""
+        return float(self.change_times[0])
+
+    def add_frames(self, timestamps: np.ndarray, matrix: np.ndarray) -> None:
+        """Fold one chunk of frames into the per-page sums; chunks may come in any order."""
+        if not len(timestamps):
+            return
+        latest = float(timestamps.max())
+        self.last_frame_ts = latest if self.last_frame_ts is None else max(self.last_frame_ts, latest)
+
+        frame_seg = assign_intervals(self.change_times, timestamps)
+        valid = frame_seg >= 0
+        if not valid.any():
+            return
+        page = self.seg_page[frame_seg[valid]]
+        matrix = matrix[valid]
+        self.frame_count += np.bincount(page, minlength=self.n_pages)
+        self.attention_sum += np.bincount(page, weights=attention_frame_scores(matrix), minlength=self.n_pages)
+        cells = heatmap_cells(*gaze_vectors(matrix), self.grid_size)
+        self.heatmaps += np.bincount(
+            page * self.grid_size * self.grid_size + cells, minlength=len(self.heatmaps)
+        )
+
+
+def compute_slide_analytics(
+    timeline: SlideTimeline,
+    words: list[dict],
+    volume_timeline: list[dict],
+    duration: float | None = None,
+) -> list[dict]:
+    """Time on slide, attention, gaze heatmap, words, WPM and volume per page."""
+    change_times, seg_page, n_pages = timeline.change_times, timeline.seg_page, timeline.n_pages
+    audio_offset = timeline.start
+
+    word_starts = np.fromiter((w["start"] for w in words), dtype=np.float64, count=len(words)) + audio_offset
+    vol_t = np.fromiter((v["t"] for v in volume_timeline), dtype=np.float64, count=len(volume_timeline)) + audio_offset
+    vol_rms = np.fromiter((v["rms"] for v in volume_timeline), dtype=np.float64, count=len(volume_timeline))
+
+    # The last slide stays up until the latest thing we know about.
+    end = max(
+        change_times[-1],
+        timeline.last_frame_ts if timeline.last_frame_ts is not None else 0.0,
+        audio_offset + (duration or 0.0),
+        float(word_starts[-1]) if len(word_starts) else 0.0,
+    )
+    seg_seconds = np.diff(np.append(change_times, end))
+    seconds = np.bincount(seg_page, weights=seg_seconds, minlength=n_pages)
+    visits = np.bincount(seg_page, minlength=n_pages)
+
+    # Audio
+    word_count = _per_page(assign_intervals(change_times, word_starts), seg_page, n_pages)
+    vol_seg = assign_intervals(change_times, vol_t)
+    vol_windows = _per_page(vol_seg, seg_page, n_pages)
+    vol_energy = _per_page(vol_seg, seg_page, n_pages, vol_rms ** 2)
+
+    grid_size = timeline.grid_size
+    heatmaps = timeline.heatmaps.reshape(n_pages, grid_size, grid_size)
+    frame_count = timeline.frame_count
+    slides = []
+    for i, page in enumerate(timeline.pages.tolist()):
+        rms = np.sqrt(vol_energy[i] / vol_windows[i]) if vol_windows[i] else 0.0
+        slides.append({
+            "page": page,
+            "visits": int(visits[i]),
+            "seconds": round(float(seconds[i]), 2),
+            "frames": int(frame_count[i]),
+            "attention_score": float(timeline.attention_sum[i] / frame_count[i]) if frame_count[i] else None,
+            "heatmap": encode_heatmap(heatmaps[i]),
+            "words": int(word_count[i]),
+            "wpm": round(float(word_count[i] / (seconds[i] / 60)), 1) if seconds[i] > 0 else 0.0,
+            "avg_volume_dbfs": round(float(20 * np.log10(rms)), 1) if rms > 0 else None,
+        })
+    return slides
@@ -0,0 +1,16 @@
+import numpy as np
+
+
+def combine_total_score(attention_score, audio_total_score, content_score):
+    """
+    Training total: mean of attention (0-1, scaled to 100), audio and content
+    score, a missing part counting as 0. Works on scalars (None = missing) and
+    on NumPy arrays (NaN = missing) for the re-score command.
+    """
+    parts = [
+        np.asarray(np.nan if attention_score is None else attention_score, dtype=np.float64) * 100,
+        np.asarray(np.nan if audio_total_score is None else audio_total_score, dtype=np.float64),
+        np.asarray(np.nan if content_score is None else content_score, dtype=np.float64),
+    ]
+    total = sum(np.nan_to_num(p) for p in parts) / 3.0
+    return float(total) if np.ndim(total) == 0 else total
@@ -0,0 +1,290 @@
+"""
+app/websockets/blendshape_ingest.py
+────────────────────────────────────────────────────────────────
+Per-connection pipeline behind `/api/v1/blendshapes/ws/add`.
+
+    receive loop ──► bounded queue ──► writer task ──► shared COPY writer
+         ▲                                  │
+         └──── backpressure on/off ◄────────┴──► ack {persisted_until}
+
+The receive loop only decodes; persistence happens in the writer task, so a
+slow commit never stalls frame reception. When the queue is full the client
+is told to slow down and reception pauses until the writer has caught up,
+instead of frames silently piling up in the socket buffer.
+
+Wire formats:
+
+* legacy JSON: one text message per frame `{training_id, timestamp, scores}`
+* binary: a text handshake `{"type": "hello", "protocol": "pp-blendshapes-bin-1",
+  "training_id": ..., "categories": [...]}` answered with `{"type": "ready", ...}`,
+  then binary messages of one or more packed frames, each a little-endian
+  float64 timestamp followed by one float32 per announced category.
+
+Control messages (`ack`, `backpressure`, `persist_failed`, `error`) are JSON
+text frames sent to every client, legacy JSON clients included, so a stalled
+queue or a lost chunk never goes unnoticed. `ready` answers the handshake and
+`engagement` is only pushed to clients that negotiated the binary protocol.
+
+The training of a handshake (or of the first JSON frame naming it) must
+exist; otherwise the socket is closed with 1008 and the reason, before any of
+its frames reach the shared writer, where one bad row would fail the batch.
+
+`engagement` is live feedback: every BLENDSHAPE_LIVE_PUSH_SECONDS the receive
+loop pushes the rolling attention score and mean gaze over the last
+BLENDSHAPE_LIVE_WINDOW_SECONDS of frames, taken from a fixed-size ring buffer
+so the cost per frame does not grow with the session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.db.database import budgeted_session
+from app.services.blendshapes_writer import blendshape_writer
+from app.services.training.training_service import TrainingService
+from app.utils.eye_tracking.blendshape_categories import CATEGORY_INDEX
+from app.utils.eye_tracking.blendshape_codec import (
+    WS_BINARY_PROTOCOL,
+    build_category_mapping,
+    decode_binary_frames,
+    frame_dtype,
+)
+from app.utils.eye_tracking.eye_tracking import RollingEngagementWindow, load_blendshape_matrix
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class UnknownTrainingError(LookupError):
+    pass
+
+
+class FrameBuffer:
+    """Frames of one training collected between two chunk writes."""
+
+    def __init__(self):
+        self.timestamps: list[np.ndarray] = []
+        self.matrices: list[np.ndarray] = []
+        self.first_ts: float | None = None
+        self.last_ts: float | None = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def extend(self, timestamps: np.ndarray, matrix: np.ndarray) -> None:
+        if not len(timestamps):
+            return
+        self.timestamps.append(timestamps)
+        self.matrices.append(matrix)
+        if self.first_ts is None:
+            self.first_ts = float(timestamps[0])
+        self.last_ts = float(timestamps[-1])
+
+    def span(self) -> float:
+        return 0.0 if self.first_ts is None else self.last_ts - self.first_ts
+
+    def drain(self) -> tuple[np.ndarray, np.ndarray]:
+        timestamps, matrix = np.concatenate(self.timestamps), np.concatenate(self.matrices)
+        self.__init__()
+        return timestamps, matrix
+
+
+class BlendshapeIngestConnection:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.BLENDSHAPE_WS_QUEUE_SIZE)
+        self.buffer = FrameBuffer()
+        self.buffer_training_id: uuid.UUID | None = None
+        self.persisted_until: float | None = None
+        self.frames_persisted = 0
+        self.throttled = False
+
+        self.training_id: uuid.UUID | None = None
+        self._training_id_raw: str | None = None
+        self._binary_dtype: np.dtype | None = None
+        self._binary_mapping: np.ndarray | None = None
+        self._send_lock = asyncio.Lock()
+        self._known_trainings: set[uuid.UUID] = set()
+
+        self.live = RollingEngagementWindow(settings.BLENDSHAPE_LIVE_WINDOW_SECONDS)
+        self._live_pushed_at = 0.0
+
+    @property
+    def negotiated(self) -> bool:
+        return self._binary_dtype is not None
+
+    async def send_control(self, message: dict) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(message)
+
+    async def run(self) -> None:
+        await self.websocket.accept()
+        writer = asyncio.create_task(self._write_loop())
+        try:
+            await self._receive_loop()
+        except WebSocketDisconnect:
+            print("[WS] Disconnected, flushing buffer...")
+        finally:
+            if not writer.done():
+                await self.queue.put(_END)
+            await writer
+
+    # ───────────────────────────────────────────────
+    # Receiving
+    # ───────────────────────────────────────────────
+    async def _receive_loop(self) -> None:
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            try:
+                item = await self._decode(message)
+            except UnknownTrainingError as e:
+                print(f"[WS] Rejecting blendshapes: {e}")
+                await self.websocket.close(code=1008, reason=str(e))
+                return
+            except Exception as e:
+                print(f"[WS] Error parsing message: {e}")
+                await self.send_control({"type": "error", "detail": str(e)})
+                continue
+            if item is not None:
+                await self._enqueue(item)
+                await self._live_feedback(item)
+
+    async def _decode(self, message: dict):
+        if message.get("bytes") is not None:
+            if not self.negotiated:
+                raise ValueError("binary frame before handshake")
+            timestamps, matrix = decode_binary_frames(message["bytes"], self._binary_dtype, self._binary_mapping)
+            return self.training_id, timestamps, matrix
+
+        payload = json.loads(message["text"])
+        if payload.get("type") == "hello":
+            await self._handshake(payload)
+            return None
+
+        if payload["training_id"] != self._training_id_raw:
+            training_id = uuid.UUID(payload["training_id"])
+            await self._check_training(training_id)
+            self.training_id = training_id
+            self._training_id_raw = payload["training_id"]
+        timestamps, matrix = load_blendshape_matrix([payload])
+        return self.training_id, timestamps, matrix
+
+    async def _handshake(self, payload: dict) -> None:
+        if payload.get("protocol") != WS_BINARY_PROTOCOL:
+            raise ValueError(f"unsupported protocol {payload.get('protocol')}")
+        training_id = uuid.UUID(payload["training_id"])
+        await self._check_training(training_id)
+        self.training_id = training_id
+        self._training_id_raw = payload["training_id"]
+        categories = payload["categories"]
+        self._binary_dtype = frame_dtype(len(categories))
+        self._binary_mapping = build_category_mapping(categories)
+        await self.send_control({
+            "type": "ready",
+            "protocol": WS_BINARY_PROTOCOL,
+            "frame_bytes": self._binary_dtype.itemsize,
+            "ignored_categories": [c for c in categories if c not in CATEGORY_INDEX],
+            "queue_size": self.queue.maxsize,
+        })
+
+    async def _check_training(self, training_id: uuid.UUID) -> None:
+        if training_id in self._known_trainings:
+            return
+        async with budgeted_session("blendshapes_ingest") as db:
+            exists = await TrainingService(db).training_exists(training_id)
+        if not exists:
+            raise UnknownTrainingError(f"training {training_id} not found")
+        self._known_trainings.add(training_id)
+
+    async def _enqueue(self, item: tuple) -> None:
+        try:
+            self.queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        # Tell the client to throttle, then stop reading until there is room again.
+        self.throttled = True
+        await self.send_control({
+            "type": "backpressure",
+            "state": "on",
+            "queued": self.queue.qsize(),
+            "persisted_until": self.persisted_until,
+        })
+        await self.queue.put(item)
+
+    async def _live_feedback(self, item: tuple) -> None:
+        if not self.negotiated or settings.BLENDSHAPE_LIVE_PUSH_SECONDS <= 0:
+            return
+        _, timestamps, matrix = item
+        self.live.push(timestamps, matrix)
+        now = time.monotonic()
+        if now - self._live_pushed_at < settings.BLENDSHAPE_LIVE_PUSH_SECONDS:
+            return
+        self._live_pushed_at = now
+        await self.send_control({"type": "engagement", **self.live.summary()})
+
+    # ───────────────────────────────────────────────
+    # Persisting
+    # ───────────────────────────────────────────────
+    async def _write_loop(self) -> None:
+        while True:
+            item = await self.queue.get()
+            if item is _END:
+                await self._persist(final=True)
+                return
+
+            training_id, timestamps, matrix = item
+            if training_id != self.buffer_training_id:
+                await self._persist()
+                self.buffer_training_id = training_id
+            self.buffer.extend(timestamps, matrix)
+            if self.buffer.span() >= settings.BLENDSHAPE_CHUNK_SECONDS:
+                await self._persist()
+
+            if self.throttled and self.queue.qsize() <= self.queue.maxsize // 2:
+                self.throttled = False
+                await self._safe_control({"type": "backpressure", "state": "off", "queued": self.queue.qsize()})
+
+    async def _persist(self, final: bool = False) -> None:
+        # With nothing buffered every chunk of this session is already
+        # committed, summary included (the writer merges it with each COPY)
+        if not len(self.buffer):
+            return
+        timestamps, matrix = self.buffer.drain()
+        try:
+            await blendshape_writer.submit(self.buffer_training_id, timestamps, matrix, final=final)
+        except Exception as e:
+            logger.exception("[WS] Storing blendshape chunk of training %s failed", self.buffer_training_id)
+            await self._safe_control({
+                "type": "persist_failed",
+                "from": float(timestamps[0]),
+                "to": float(timestamps[-1]),
+                "detail": str(e),
+            })
+            return
+
+        self.persisted_until = float(timestamps.max())
+        self.frames_persisted += len(timestamps)
+        await self._safe_control({
+            "type": "ack",
+            "persisted_until": self.persisted_until,
+            "frames": self.frames_persisted,
+        })
+
+    async def _safe_control(self, message: dict) -> None:
+        """Control message that may race with the client going away."""
+        try:
+            await self.send_control(message)
+        except Exception:
+            pass
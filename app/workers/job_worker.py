@@ -0,0 +1,187 @@
+"""
+app/workers/job_worker.py
+────────────────────────────────────────────────────────────────
+Drains the Postgres-backed `jobs` queue outside the API process.
+
+    python -m app.workers.job_worker [--concurrency N] [--kind finish_recording] [--kind presentation_findings]
+
+Every slot claims one job at a time with SELECT … FOR UPDATE SKIP LOCKED, so
+any number of worker processes can run side by side. While a job runs its
+lease is extended every JOB_HEARTBEAT_SECONDS; only a job whose worker died is
+reclaimed. A job that raises is retried with exponential backoff until its
+`max_attempts` are used up.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import signal
+import traceback
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import async_engine, async_session
+from app.models import user_model, presentation_model, llm_cache_model  # noqa: F401  (register mappers)
+from app.models.job_model import Job
+from app.schemas.job_schema import JobKind
+from app.services.findings.findings_service import FindingService
+from app.services.jobs.job_service import JobService
+from app.services.llm_cache import llm_result_cache
+from app.services.recordings.recording_service import RecordingService
+from app.utils.findings.findings_generator import shutdown_raster_pool
+from app.utils.openai.llm_gateway import llm_gateway
+
+JobHandler = Callable[[AsyncSession, Job], Awaitable[dict | None]]
+FailureHandler = Callable[[AsyncSession, Job], Awaitable[None]]
+
+
+async def handle_finish_recording(db: AsyncSession, job: Job) -> dict:
+    payload = job.payload
+    return await RecordingService(db).finish_recording(
+        training_id=payload["training_id"],
+        prefix=payload["prefix"],
+        slide_events=payload.get("slide_events"),
+    )
+
+
+async def handle_presentation_findings(db: AsyncSession, job: Job) -> dict:
+    payload = job.payload
+    return await FindingService(db).generate_findings(
+        presentation_id=payload["presentation_id"],
+        file_url=payload["file_url"],
+        description=payload["description"],
+        partial=payload.get("partial", True),
+        final_attempt=job.attempts >= job.max_attempts,
+    )
+
+
+async def fail_presentation_findings(db: AsyncSession, job: Job) -> None:
+    await FindingService(db).mark_failed(job.payload["presentation_id"], job.error)
+
+
+JOB_HANDLERS: dict[JobKind, JobHandler] = {
+    JobKind.finish_recording: handle_finish_recording,
+    JobKind.presentation_findings: handle_presentation_findings,
+}
+
+# Run when a job fails for good without its handler seeing it (lease expired on the last attempt)
+JOB_FAILURE_HANDLERS: dict[JobKind, FailureHandler] = {
+    JobKind.presentation_findings: fail_presentation_findings,
+}
+
+
+async def handle_exhausted(job: Job) -> None:
+    handler = JOB_FAILURE_HANDLERS.get(job.kind)
+    if handler is None:
+        return
+    try:
+        async with async_session() as db:
+            await handler(db, job)
+    except Exception as e:
+        print(f"[JOB] failure handler for {job.kind.value} {job.id} failed: {e}")
+
+
+async def keep_lease(job: Job) -> None:
+    """Extend the job's lease every JOB_HEARTBEAT_SECONDS so a long job is not reclaimed while it runs."""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        try:
+            async with async_session() as db:
+                if not await JobService(db).extend_lease(job.id, job.attempts):
+                    print(f"[JOB] {job.kind.value} {job.id} lost its lease")
+                    return
+        except Exception as e:
+            print(f"[JOB] lease heartbeat for {job.id} failed: {e}")
+
+
+async def run_job(job: Job) -> None:
+    handler = JOB_HANDLERS[job.kind]
+    heartbeat = asyncio.create_task(keep_lease(job))
+    try:
+        async with async_session() as db:
+            result = await handler(db, job)
+    except Exception as e:
+        traceback.print_exc()
+        async with async_session() as db:
+            owned = await JobService(db).mark_failed(job.id, job.attempts, f"{type(e).__name__}: {e}")
+        if not owned:
+            print(f"[JOB] {job.kind.value} {job.id} failed, but attempt {job.attempts} no longer holds the job: {e}")
+            return
+        print(f"[JOB] {job.kind.value} {job.id} failed (attempt {job.attempts}): {e}")
+        return
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async with async_session() as db:
+        owned = await JobService(db).mark_done(job.id, job.attempts, result)
+    if not owned:
+        print(f"[JOB] {job.kind.value} {job.id} finished, but attempt {job.attempts} no longer holds the job; result dropped")
+        return
+    print(f"[JOB] {job.kind.value} {job.id} done")
+
+
+async def worker_slot(slot: int, kinds: list[JobKind], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        async with async_session() as db:
+            job = await JobService(db).claim_next(kinds, on_exhausted=handle_exhausted)
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        print(f"[JOB] slot {slot} picked {job.kind.value} {job.id}")
+        await run_job(job)
+
+
+async def log_llm_stats(stop: asyncio.Event) -> None:
+    """Queue depth, wait times, budget and cache hit rates of LLM calls, every LLM_STATS_LOG_SECONDS."""
+    if settings.LLM_STATS_LOG_SECONDS <= 0:
+        return
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.LLM_STATS_LOG_SECONDS)
+            return
+        except asyncio.TimeoutError:
+            pass
+        stats = llm_gateway.stats()
+        if stats["governor"] is not None:
+            print(f"[LLM] {json.dumps({**stats, 'cache': llm_result_cache.stats()})}")
+
+
+async def main(concurrency: int, kinds: list[JobKind]) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"[JOB] worker started with {concurrency} slot(s) for {[k.value for k in kinds]}")
+    try:
+        await asyncio.gather(
+            log_llm_stats(stop),
+            *(worker_slot(i, kinds, stop) for i in range(concurrency)),
+        )
+    finally:
+        await llm_gateway.close()
+        shutdown_raster_pool()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the PitchPilot background job worker.")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY,
+        help="Number of jobs processed in parallel by this process",
+    )
+    parser.add_argument(
+        "--kind", action="append", choices=[k.value for k in JobKind],
+        help="Only process jobs of this kind (repeatable); defaults to all kinds",
+    )
+    args = parser.parse_args()
+    selected = [JobKind(k) for k in args.kind] if args.kind else list(JobKind)
+    asyncio.run(main(args.concurrency, selected))
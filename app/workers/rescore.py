@@ -0,0 +1,334 @@
+"""
+app/workers/rescore.py
+────────────────────────────────────────────────────────────────
+Recomputes stored scores after the SCORE_* / FINDING_WEIGHT_* settings
+changed, purely from the intermediate metrics already in the database
+(WPM, dBFS, filler ratio, clarity, engagement, attention, category scores).
+Nothing is re-transcribed and no LLM is called.
+
+    python -m app.workers.rescore [--batch-size 5000] [--processes N]
+                                  [--checkpoint PATH] [--restart] [--dry-run]
+
+Two passes, each walking its table in primary-key order (keyset pagination):
+
+1. findings   presentation_findings.total_score from the four category scores
+2. trainings  training_results audio sub-scores and total, trainings.total_score
+
+Batches are scored with the vectorised functions of `audio_score_calculator`
+in a process pool while the next batches are fetched. Every batch is
+committed before it is recorded in the checkpoint file, so an interrupted run
+continues where it stopped. A checkpoint written with different weights is
+ignored and the run starts over.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import async_engine, async_session
+from app.models import user_model  # noqa: F401  (register mappers)
+from app.models.presentation_model import PresentationFinding, Training, TrainingResult
+from app.utils.audio.audio_score_calculator import audio_scores_from_metrics, read_env_score_config
+from app.utils.findings.calculator import findings_total_score
+from app.utils.training_score import combine_total_score
+
+DEFAULT_CHECKPOINT = ".rescore_checkpoint.json"
+
+
+@dataclass
+class Batch:
+    ids: list[uuid.UUID]
+    columns: dict[str, np.ndarray]
+    extra: dict[str, list]
+
+    @property
+    def last_id(self) -> uuid.UUID:
+        return self.ids[-1]
+
+
+def _column(rows, index: int) -> np.ndarray:
+    """Float column with NULL → NaN."""
+    return np.array([r[index] for r in rows], dtype=np.float64)
+
+
+def _nullable(values: np.ndarray) -> list:
+    return [None if np.isnan(v) else float(v) for v in values.tolist()]
+
+
+def scoring_fingerprint() -> str:
+    weights = {
+        "audio": read_env_score_config(),
+        "findings": [
+            settings.FINDING_WEIGHT_PREFLIGHT,
+            settings.FINDING_WEIGHT_ALTITUDE,
+            settings.FINDING_WEIGHT_FLIGHT_PATH,
+            settings.FINDING_WEIGHT_COCKPIT,
+        ],
+    }
+    return hashlib.sha256(json.dumps(weights, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ───────────────────────────────────────────────
+# Scoring (runs in the process pool)
+# ───────────────────────────────────────────────
+def score_findings(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    total = np.round(findings_total_score(
+        columns["preflight"], columns["altitude"], columns["flight_path"], columns["cockpit"]
+    ), 2)
+    # Findings without category scores keep their stored total
+    return {"total_score": np.where(np.isnan(total), columns["total_score"], total)}
+
+
+def score_trainings(columns: dict[str, np.ndarray], config: dict) -> dict[str, np.ndarray]:
+    audio = audio_scores_from_metrics(
+        columns["wpm"], columns["avg_dbfs"], columns["filler_ratio"],
+        columns["clarity"], columns["engagement"], config,
+    )
+    recomputed = ~np.isnan(audio["total_score"])
+    audio_total = np.where(recomputed, audio["total_score"], columns["audio_total_score"])
+    return {
+        "speaking_score": audio["speaking_score"],
+        "volume_score": audio["volume_score"],
+        "filler_score": audio["filler_score"],
+        "audio_total_score": np.where(recomputed, audio_total, np.nan),
+        "total_score": combine_total_score(columns["attention"], audio_total, columns["content"]),
+    }
+
+
+# ───────────────────────────────────────────────
+# Findings pass
+# ───────────────────────────────────────────────
+async def fetch_findings(db: AsyncSession, after: uuid.UUID | None, limit: int) -> Batch | None:
+    stmt = select(
+        PresentationFinding.id,
+        PresentationFinding.preflight_check_score,
+        PresentationFinding.altitude_score,
+        PresentationFinding.flight_path_score,
+        PresentationFinding.cockpit_score,
+        PresentationFinding.total_score,
+    ).order_by(PresentationFinding.id).limit(limit)
+    if after is not None:
+        stmt = stmt.where(PresentationFinding.id > after)
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return None
+    names = ["preflight", "altitude", "flight_path", "cockpit", "total_score"]
+    return Batch(
+        ids=[r[0] for r in rows],
+        columns={name: _column(rows, i + 1) for i, name in enumerate(names)},
+        extra={},
+    )
+
+
+async def write_findings(db: AsyncSession, batch: Batch, scores: dict[str, np.ndarray]) -> None:
+    await db.execute(
+        text(
+            "UPDATE presentation_findings AS f SET total_score = v.total_score "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:totals AS float8[])) AS v(id, total_score) "
+            "WHERE f.id = v.id"
+        ),
+        {"ids": batch.ids, "totals": scores["total_score"].tolist()},
+    )
+
+
+# ───────────────────────────────────────────────
+# Trainings pass
+# ───────────────────────────────────────────────
+async def fetch_trainings(db: AsyncSession, after: uuid.UUID | None, limit: int) -> Batch | None:
+    # Same pick as the finish pipeline: newest active finding, else newest finding
+    content = (
+        select(PresentationFinding.total_score)
+        .where(PresentationFinding.presentation_id == Training.presentation_id)
+        .order_by(PresentationFinding.is_active.desc(), PresentationFinding.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    audio = TrainingResult.audio_scores
+    stmt = (
+        select(
+            TrainingResult.id,
+            TrainingResult.training_id,
+            audio["wpm"].as_float(),
+            audio["avg_volume_dbfs"].as_float(),
+            audio["filler_ratio"].as_float(),
+            audio["clarity_score"].as_float(),
+            audio["engagement_rating"].as_float(),
+            TrainingResult.audio_total_score,
+            TrainingResult.eye_tracking_total_score,
+            content,
+        )
+        .join(Training, Training.id == TrainingResult.training_id)
+        .order_by(TrainingResult.id)
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(TrainingResult.id > after)
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return None
+    names = ["wpm", "avg_dbfs", "filler_ratio", "clarity", "engagement", "audio_total_score", "attention", "content"]
+    return Batch(
+        ids=[r[0] for r in rows],
+        columns={name: _column(rows, i + 2) for i, name in enumerate(names)},
+        extra={"training_ids": [r[1] for r in rows]},
+    )
+
+
+async def write_trainings(db: AsyncSession, batch: Batch, scores: dict[str, np.ndarray]) -> None:
+    await db.execute(
+        text(
+            "UPDATE training_results AS r SET "
+            "audio_total_score = v.audio_total, "
+            "audio_scores = r.audio_scores || jsonb_build_object("
+            "'speaking_score', v.speaking, 'volume_score', v.volume, "
+            "'filler_score', v.filler, 'total_score', v.audio_total) "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:audio_total AS float8[]), CAST(:speaking AS float8[]), "
+            "CAST(:volume AS float8[]), CAST(:filler AS float8[])) AS v(id, audio_total, speaking, volume, filler) "
+            "WHERE r.id = v.id AND v.audio_total IS NOT NULL"
+        ),
+        {
+            "ids": batch.ids,
+            "audio_total": _nullable(scores["audio_total_score"]),
+            "speaking": _nullable(scores["speaking_score"]),
+            "volume": _nullable(scores["volume_score"]),
+            "filler": _nullable(scores["filler_score"]),
+        },
+    )
+    await db.execute(
+        text(
+            "UPDATE trainings AS t SET total_score = v.total_score "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:totals AS float8[])) AS v(id, total_score) "
+            "WHERE t.id = v.id"
+        ),
+        {"ids": batch.extra["training_ids"], "totals": scores["total_score"].tolist()},
+    )
+
+
+# ───────────────────────────────────────────────
+# Driver
+# ───────────────────────────────────────────────
+class Checkpoint:
+    def __init__(self, path: pathlib.Path, fingerprint: str, restart: bool):
+        self.path = path
+        self.state = {"fingerprint": fingerprint, "passes": {}}
+        if path.exists() and not restart:
+            stored = json.loads(path.read_text())
+            if stored.get("fingerprint") == fingerprint:
+                self.state = stored
+            else:
+                print(f"[RESCORE] Ignoring {path}: written with different weights")
+
+    def position(self, name: str) -> tuple[uuid.UUID | None, int, bool]:
+        entry = self.state["passes"].get(name, {})
+        last_id = entry.get("last_id")
+        return (uuid.UUID(last_id) if last_id else None), entry.get("rows", 0), entry.get("done", False)
+
+    def save(self, name: str, last_id: uuid.UUID | None, rows: int, done: bool = False) -> None:
+        self.state["passes"][name] = {"last_id": str(last_id) if last_id else None, "rows": rows, "done": done}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state))
+        tmp.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+async def run_pass(
+    name: str,
+    fetch: Callable[[AsyncSession, uuid.UUID | None, int], Awaitable[Batch | None]],
+    score: Callable[..., dict[str, np.ndarray]],
+    score_args: tuple,
+    write: Callable[[AsyncSession, Batch, dict[str, np.ndarray]], Awaitable[None]],
+    pool: Executor,
+    depth: int,
+    batch_size: int,
+    checkpoint: Checkpoint,
+    dry_run: bool,
+) -> None:
+    last_id, rows_before, done = checkpoint.position(name)
+    if done:
+        print(f"[RESCORE] {name}: already done, skipping")
+        return
+    if last_id is not None:
+        print(f"[RESCORE] {name}: resuming after {last_id} ({rows_before} rows done)")
+
+    loop = asyncio.get_running_loop()
+    inflight: deque[tuple[Batch, asyncio.Future]] = deque()
+    exhausted = False
+    rows = 0
+    started = time.perf_counter()
+
+    async with async_session() as reader, async_session() as writer:
+        while True:
+            # Keep up to `depth` batches scoring in the pool while the oldest is written
+            while not exhausted and len(inflight) < depth:
+                batch = await fetch(reader, last_id, batch_size)
+                await reader.rollback()  # don't hold a snapshot open between batches
+                if batch is None:
+                    exhausted = True
+                    break
+                last_id = batch.last_id
+                inflight.append((batch, loop.run_in_executor(pool, score, batch.columns, *score_args)))
+            if not inflight:
+                break
+
+            batch, future = inflight.popleft()
+            scores = await future
+            if not dry_run:
+                await write(writer, batch, scores)
+                await writer.commit()
+                checkpoint.save(name, batch.last_id, rows_before + rows + len(batch.ids))
+            rows += len(batch.ids)
+            elapsed = time.perf_counter() - started
+            print(f"[RESCORE] {name}: {rows_before + rows} rows, {rows / elapsed:,.0f} rows/s")
+
+    if not dry_run:
+        checkpoint.save(name, last_id, rows_before + rows, done=True)
+    elapsed = time.perf_counter() - started
+    print(f"[RESCORE] {name}: finished {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+async def main(batch_size: int, processes: int, checkpoint_path: str, restart: bool, dry_run: bool) -> None:
+    checkpoint = Checkpoint(pathlib.Path(checkpoint_path), scoring_fingerprint(), restart)
+    config = read_env_score_config()
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            # Findings first: the training total reads the content score
+            await run_pass("findings", fetch_findings, score_findings, (), write_findings,
+                           pool, processes, batch_size, checkpoint, dry_run)
+            await run_pass("trainings", fetch_trainings, score_trainings, (config,), write_trainings,
+                           pool, processes, batch_size, checkpoint, dry_run)
+    finally:
+        await async_engine.dispose()
+    if not dry_run:
+        checkpoint.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute stored PitchPilot scores with the current weights.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per fetch / update")
+    parser.add_argument(
+        "--processes", type=int, default=os.cpu_count() or 1,
+        help="Scoring processes; also the number of batches kept in flight",
+    )
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress file used to resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Score and report without writing")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, max(1, args.processes), args.checkpoint, args.restart, args.dry_run))
@@ -1,6 +1,6 @@
 from logging.config import fileConfig
 from app.models.base_model import Base
-from app.models import user_model, presentation_model
+from app.models import user_model, presentation_model, job_model, llm_cache_model
 
 
 from sqlalchemy import engine_from_config
@@ -0,0 +1,42 @@
+"""llm cache
+
+Revision ID: 0b6d2e8f4a19
+Revises: f3a9c61e0b57
+Create Date: 2026-10-18 17:24:05.731266
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d2e8f4a19'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c61e0b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_cache',
+    sa.Column('key', sa.String(length=64), nullable=False, comment='sha256 hex of kind + key parts'),
+    sa.Column('kind', sa.String(length=32), nullable=False, comment='LLM call type, e.g. audio_feedback'),
+    sa.Column('value', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_llm_cache_expires_at', 'llm_cache', ['expires_at'], unique=False)
+    op.create_index('ix_llm_cache_last_used_at', 'llm_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_llm_cache_last_used_at', table_name='llm_cache')
+    op.drop_index('ix_llm_cache_expires_at', table_name='llm_cache')
+    op.drop_table('llm_cache')
@@ -0,0 +1,47 @@
+"""add jobs table
+
+Revision ID: 3f1c2a9d7b10
+Revises: cff98534dec4
+Create Date: 2026-10-18 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b10'
+down_revision: Union[str, Sequence[str], None] = 'cff98534dec4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.Enum('finish_recording', name='job_kind'), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'running', 'done', 'failed', name='job_status'), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment='Handler return value once done'),
+    sa.Column('error', sa.Text(), nullable=True, comment='Last error message'),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(timezone=True), nullable=False, comment='Earliest time a worker may pick the job up (used for retry backoff)'),
+    sa.Column('leased_until', sa.DateTime(timezone=True), nullable=True, comment='Running jobs whose lease expired are reclaimed by other workers'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status_run_after', table_name='jobs')
+    op.drop_table('jobs')
+    sa.Enum(name='job_status').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='job_kind').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,38 @@
+"""presentation findings status
+
+Revision ID: 7a4e0c2b9f31
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 10:03:27.551904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4e0c2b9f31'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a9d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+processing_status = sa.Enum('pending', 'running', 'done', 'failed', name='processing_status')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE job_kind ADD VALUE IF NOT EXISTS 'presentation_findings'")
+    processing_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('presentations', sa.Column('findings_status', processing_status, nullable=True, comment='State of the background findings generation for the uploaded file'))
+    op.add_column('presentations', sa.Column('findings_error', sa.Text(), nullable=True))
+    # Everything uploaded before this revision was analysed synchronously.
+    op.execute("UPDATE presentations SET findings_status = 'done'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('presentations', 'findings_error')
+    op.drop_column('presentations', 'findings_status')
+    processing_status.drop(op.get_bind(), checkfirst=True)
+    # Postgres cannot drop a single enum value; 'presentation_findings' stays in job_kind.
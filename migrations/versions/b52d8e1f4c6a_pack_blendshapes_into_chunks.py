@@ -0,0 +1,176 @@
+"""pack blendshapes into chunks
+
+Revision ID: b52d8e1f4c6a
+Revises: 7a4e0c2b9f31
+Create Date: 2026-10-18 11:41:09.317254
+
+"""
+import json
+import uuid
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52d8e1f4c6a'
+down_revision: Union[str, Sequence[str], None] = '7a4e0c2b9f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of schema version 1 so this revision never changes behaviour.
+SCHEMA_VERSION = 1
+CATEGORIES = (
+    "_neutral", "browDownLeft", "browDownRight", "browInnerUp", "browOuterUpLeft",
+    "browOuterUpRight", "cheekPuff", "cheekSquintLeft", "cheekSquintRight", "eyeBlinkLeft",
+    "eyeBlinkRight", "eyeLookDownLeft", "eyeLookDownRight", "eyeLookInLeft", "eyeLookInRight",
+    "eyeLookOutLeft", "eyeLookOutRight", "eyeLookUpLeft", "eyeLookUpRight", "eyeSquintLeft",
+    "eyeSquintRight", "eyeWideLeft", "eyeWideRight", "jawForward", "jawLeft", "jawOpen",
+    "jawRight", "mouthClose", "mouthDimpleLeft", "mouthDimpleRight", "mouthFrownLeft",
+    "mouthFrownRight", "mouthFunnel", "mouthLeft", "mouthLowerDownLeft", "mouthLowerDownRight",
+    "mouthPressLeft", "mouthPressRight", "mouthPucker", "mouthRight", "mouthRollLower",
+    "mouthRollUpper", "mouthShrugLower", "mouthShrugUpper", "mouthSmileLeft", "mouthSmileRight",
+    "mouthStretchLeft", "mouthStretchRight", "mouthUpperUpLeft", "mouthUpperUpRight",
+    "noseSneerLeft", "noseSneerRight",
+)
+CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORIES)}
+CHUNK_SECONDS = 10.0
+
+chunks_table = sa.table(
+    'blendshape_chunks',
+    sa.column('id', sa.UUID()),
+    sa.column('training_id', sa.UUID()),
+    sa.column('start_ts', sa.Float()),
+    sa.column('end_ts', sa.Float()),
+    sa.column('frame_count', sa.Integer()),
+    sa.column('schema_version', sa.SmallInteger()),
+    sa.column('timestamps', sa.LargeBinary()),
+    sa.column('scores', sa.LargeBinary()),
+)
+
+blendshapes_table = sa.table(
+    'blendshapes',
+    sa.column('id', sa.UUID()),
+    sa.column('training_id', sa.UUID()),
+    sa.column('timestamp', sa.Float()),
+    sa.column('scores', postgresql.JSONB()),
+)
+
+
+def _row_from_scores(scores) -> Optional[np.ndarray]:
+    """Matrix row of one stored frame, None if the frame is empty or unreadable."""
+    if isinstance(scores, str):
+        try:
+            scores = json.loads(scores)
+        except ValueError:
+            return None
+    if not scores:
+        return None
+    row = np.zeros(len(CATEGORIES), dtype=np.float32)
+    if isinstance(scores, list):
+        for b in scores:
+            if not isinstance(b, dict):
+                continue
+            j = CATEGORY_INDEX.get(b.get("categoryName"))
+            if j is not None:
+                row[j] = b.get("score", 0.0)
+        return row
+    if isinstance(scores, dict):
+        for name, score in scores.items():
+            j = CATEGORY_INDEX.get(name)
+            if j is not None:
+                row[j] = score
+        return row
+    return None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blendshape_chunks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('training_id', sa.UUID(), nullable=False),
+    sa.Column('start_ts', sa.Float(), nullable=False, comment='Timestamp of the first frame, seconds since training start'),
+    sa.Column('end_ts', sa.Float(), nullable=False, comment='Timestamp of the last frame'),
+    sa.Column('frame_count', sa.Integer(), nullable=False),
+    sa.Column('schema_version', sa.SmallInteger(), nullable=False, comment='Category order of the packed scores'),
+    sa.Column('timestamps', sa.LargeBinary(), nullable=False, comment='frame_count little-endian float64'),
+    sa.Column('scores', sa.LargeBinary(), nullable=False, comment='frame_count x categories little-endian float32, row-major'),
+    sa.ForeignKeyConstraint(['training_id'], ['trainings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_blendshape_chunks_training_id_start_ts', 'blendshape_chunks', ['training_id', 'start_ts'], unique=False)
+
+    bind = op.get_bind()
+    training_ids = bind.execute(sa.text("SELECT DISTINCT training_id FROM blendshapes")).scalars().all()
+    for training_id in training_ids:
+        rows = bind.execute(
+            sa.select(blendshapes_table.c.timestamp, blendshapes_table.c.scores)
+            .where(blendshapes_table.c.training_id == training_id)
+            .order_by(blendshapes_table.c.timestamp.asc())
+        ).all()
+        # Frames the runtime loader skips (empty or unreadable scores) are dropped
+        frames = [(r.timestamp, row) for r in rows if (row := _row_from_scores(r.scores)) is not None]
+        if not frames:
+            continue
+        timestamps = np.array([ts for ts, _ in frames], dtype='<f8')
+        matrix = np.stack([row for _, row in frames]).astype('<f4')
+
+        bucket = np.floor((timestamps - timestamps[0]) / CHUNK_SECONDS).astype(np.int64)
+        bounds = np.flatnonzero(np.diff(bucket)) + 1
+        records = []
+        for ts, scores in zip(np.split(timestamps, bounds), np.split(matrix, bounds)):
+            records.append({
+                'id': uuid.uuid4(),
+                'training_id': training_id,
+                'start_ts': float(ts[0]),
+                'end_ts': float(ts[-1]),
+                'frame_count': len(ts),
+                'schema_version': SCHEMA_VERSION,
+                'timestamps': ts.tobytes(),
+                'scores': np.ascontiguousarray(scores).tobytes(),
+            })
+        op.bulk_insert(chunks_table, records)
+
+    op.drop_table('blendshapes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table('blendshapes',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('training_id', sa.UUID(), nullable=False),
+    sa.Column('timestamp', sa.Float(), nullable=False, comment='Seconds since training start'),
+    sa.Column('scores', postgresql.JSONB(astext_type=sa.Text()), nullable=False, comment="Map of blendshape scores, e.g. {'jawOpen': 0.42}"),
+    sa.ForeignKeyConstraint(['training_id'], ['trainings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    bind = op.get_bind()
+    chunks = bind.execute(
+        sa.select(
+            chunks_table.c.training_id,
+            chunks_table.c.timestamps,
+            chunks_table.c.scores,
+        ).where(chunks_table.c.schema_version == SCHEMA_VERSION)
+    )
+    for chunk in chunks:
+        timestamps = np.frombuffer(chunk.timestamps, dtype='<f8')
+        matrix = np.frombuffer(chunk.scores, dtype='<f4').reshape(len(timestamps), len(CATEGORIES))
+        op.bulk_insert(blendshapes_table, [
+            {
+                'id': uuid.uuid4(),
+                'training_id': chunk.training_id,
+                'timestamp': ts,
+                'scores': [
+                    {"index": j, "score": score, "categoryName": name, "displayName": ""}
+                    for j, (name, score) in enumerate(zip(CATEGORIES, row))
+                ],
+            }
+            for ts, row in zip(timestamps.tolist(), matrix.tolist())
+        ])
+
+    op.drop_index('ix_blendshape_chunks_training_id_start_ts', table_name='blendshape_chunks')
+    op.drop_table('blendshape_chunks')
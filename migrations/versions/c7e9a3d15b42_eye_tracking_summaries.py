@@ -0,0 +1,38 @@
+"""eye tracking summaries
+
+Revision ID: c7e9a3d15b42
+Revises: b52d8e1f4c6a
+Create Date: 2026-10-18 13:26:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e9a3d15b42'
+down_revision: Union[str, Sequence[str], None] = 'b52d8e1f4c6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing trainings get their summary built lazily on their next finish.
+    op.create_table('eye_tracking_summaries',
+    sa.Column('training_id', sa.UUID(), nullable=False),
+    sa.Column('frame_count', sa.Integer(), nullable=False, comment='Frames folded into this summary'),
+    sa.Column('attention_sum', sa.Float(), nullable=False, comment='Sum of per-frame attention scores'),
+    sa.Column('grid_size', sa.Integer(), nullable=False),
+    sa.Column('heatmap', sa.LargeBinary(), nullable=False, comment='grid_size x grid_size little-endian uint32 counts, index [gx, gy]'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['training_id'], ['trainings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('training_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('eye_tracking_summaries')
@@ -0,0 +1,29 @@
+"""training result slide scores
+
+Revision ID: d81f6b2a4e07
+Revises: c7e9a3d15b42
+Create Date: 2026-10-18 14:02:11.530884
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f6b2a4e07'
+down_revision: Union[str, Sequence[str], None] = 'c7e9a3d15b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('training_results', sa.Column('slide_scores', postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment='Per-slide time, attention, heatmap, words, WPM and volume'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('training_results', 'slide_scores')
@@ -0,0 +1,36 @@
+"""slide findings cache
+
+Revision ID: e4b70c91d2a8
+Revises: d81f6b2a4e07
+Create Date: 2026-10-18 15:10:37.228415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b70c91d2a8'
+down_revision: Union[str, Sequence[str], None] = 'd81f6b2a4e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('slide_findings_cache',
+    sa.Column('key', sa.String(length=64), nullable=False, comment='sha256 hex of page content + prompt inputs'),
+    sa.Column('prompt_version', sa.String(length=32), nullable=False),
+    sa.Column('findings', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('slide_findings_cache')
@@ -0,0 +1,39 @@
+"""presentation finding events
+
+Revision ID: f3a9c61e0b57
+Revises: e4b70c91d2a8
+Create Date: 2026-10-18 16:02:11.584930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c61e0b57'
+down_revision: Union[str, Sequence[str], None] = 'e4b70c91d2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('presentation_finding_events',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('presentation_id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False, comment='status | slides | scores'),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['presentation_id'], ['presentations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_presentation_finding_events_presentation_id_id', 'presentation_finding_events', ['presentation_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_presentation_finding_events_presentation_id_id', table_name='presentation_finding_events')
+    op.drop_table('presentation_finding_events')